@@ -10,14 +10,6 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from src.utils.config import ConfigLoader, ConfigurationError
 from src.utils.logger import BotLogger
-from src.processors.content_analyzer import ContentAnalyzer
-from src.processors.media_processor import MediaProcessor
-from src.processors.article_processor import ArticleProcessor
-from src.obsidian.vault_manager import VaultManager
-from src.obsidian.note_creator import NoteCreator
-from src.obsidian.note_finder import NoteFinder
-from src.bot.handlers import MessageHandlers
-from src.bot.telegram_client import TelegramBot
 
 
 def main():
@@ -28,6 +20,16 @@ def main():
         config_loader = ConfigLoader()
         config = config_loader.load()
 
+        # Import heavy components only once configuration is known to be valid
+        from src.processors.content_analyzer import ContentAnalyzer
+        from src.processors.media_processor import MediaProcessor
+        from src.processors.article_processor import ArticleProcessor
+        from src.obsidian.vault_manager import VaultManager
+        from src.obsidian.note_creator import NoteCreator
+        from src.obsidian.note_finder import NoteFinder
+        from src.bot.handlers import MessageHandlers
+        from src.bot.telegram_client import TelegramBot
+
         # Setup logging
         logger = BotLogger.setup(config)
         logger.info("=" * 60)
@@ -55,7 +57,8 @@ def main():
         note_creator = NoteCreator(config=config)
 
         note_finder = NoteFinder(
-            vault_path=config['obsidian']['vault_path']
+            vault_path=config['obsidian']['vault_path'],
+            index_dir=config['obsidian'].get('index_dir', 'cache')
         )
 
         content_analyzer = ContentAnalyzer(
@@ -91,7 +94,11 @@ def main():
         logger.info("Press Ctrl+C to stop")
         logger.info("=" * 60)
 
-        bot.run()
+        try:
+            bot.run()
+        finally:
+            note_finder.close()
+            media_processor.close()
 
     except ConfigurationError as e:
         print(f"\n❌ Configuration Error: {e}\n")
@@ -1,5 +1,6 @@
 """Abstract base class for AI providers."""
 
+import functools
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional
 
@@ -12,6 +13,8 @@ class AIProviderError(Exception):
 class AIProvider(ABC):
     """Abstract interface for AI providers (Claude, Ollama, etc.)."""
 
+    __slots__ = ("config", "_max_content_tokens")
+
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the AI provider.
@@ -20,6 +23,9 @@ class AIProvider(ABC):
             config: AI configuration dictionary
         """
         self.config = config
+        self._max_content_tokens = int(
+            config.get('analysis', {}).get('max_content_tokens', 2500)
+        )
 
     @abstractmethod
     async def analyze_content(
@@ -30,6 +36,10 @@ class AIProvider(ABC):
         """
         Analyze content and return structured suggestions.
 
+        All fields come back from a single model call. Callers that need
+        more than one of them should use this rather than the per-field
+        helpers below, each of which costs a separate round-trip.
+
         Args:
             content: The content to analyze (text, transcription, etc.)
             context: Additional context (source, existing folders, etc.)
@@ -132,18 +142,62 @@ class AIProvider(ABC):
         """
         pass
 
-    def _truncate_content(self, content: str, max_chars: int = 10000) -> str:
+    async def warmup(self) -> None:
+        """
+        Prepare the provider before the first real request.
+
+        Called once at bot startup. The default does nothing; providers
+        override it to open connections or load models ahead of time.
+        Implementations must not raise.
         """
-        Truncate content to avoid token limits.
+        return None
+
+    def _truncate_content(self, content: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Truncate content to an estimated token budget.
+
+        The budget is in tokens rather than characters so that scripts
+        which need more tokens per character (Cyrillic, CJK, emoji) are
+        cut shorter than plain English, which keeps roughly 4 characters
+        per token.
 
         Args:
             content: Content to truncate
-            max_chars: Maximum number of characters
+            max_tokens: Approximate maximum number of tokens
+                (defaults to ai.analysis.max_content_tokens)
 
         Returns:
             Truncated content with indicator if truncated
         """
-        if len(content) <= max_chars:
-            return content
+        return _truncate(content, max_tokens or self._max_content_tokens)
+
+
+# Token estimate without a tokenizer: ~4 ASCII characters per token, and
+# each extra UTF-8 byte of a non-ASCII character adds about 0.3 tokens
+_TOKENS_PER_CHAR = 0.25
+_TOKENS_PER_EXTRA_BYTE = 0.3
+_MAX_TOKENS_PER_CHAR = _TOKENS_PER_CHAR + 3 * _TOKENS_PER_EXTRA_BYTE
+
+
+@functools.lru_cache(maxsize=32)
+def _truncate(content: str, max_tokens: int) -> str:
+    """
+    Memoized truncation shared by all providers.
+
+    Providers call this once per method, so a multi-call workflow on the
+    same message gets the already-truncated string back from the cache
+    instead of slicing it again.
+    """
+    length = len(content)
+
+    # Short enough even if every character were a 4-byte code point
+    if length * _MAX_TOKENS_PER_CHAR <= max_tokens:
+        return content
+
+    extra_bytes = len(content.encode('utf-8', 'surrogatepass')) - length
+    estimated_tokens = length * _TOKENS_PER_CHAR + extra_bytes * _TOKENS_PER_EXTRA_BYTE
+    if estimated_tokens <= max_tokens:
+        return content
 
-        return content[:max_chars] + "\n\n[Content truncated for analysis...]"
+    max_chars = int(length * max_tokens / estimated_tokens)
+    return content[:max_chars] + "\n\n[Content truncated for analysis...]"
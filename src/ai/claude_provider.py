@@ -1,22 +1,81 @@
 """Claude AI provider implementation."""
 
-import json
+import copy
+import hashlib
 import logging
+import re
+from time import perf_counter
 from typing import Dict, List, Any, Optional
 
 import anthropic
 
 from .base import AIProvider, AIProviderError
 from . import prompts
+from src.utils import json_utils
+from src.utils.cache import LRUCache
 from src.utils.logger import get_eval_logger
 
 
 logger = logging.getLogger('obsidian_telegram_bot')
 eval_logger = get_eval_logger()
 
+# JSON object wrapped in a markdown code block (```json ... ``` or ``` ... ```)
+_CODEBLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+# Comma-separated tag list, swallowing whitespace around each comma
+_TAG_SPLIT = re.compile(r"\s*,\s*")
+
+# Non-blank line of a plain-text list, without its leading "- " bullet
+_LINE_SPLIT = re.compile(r"^[ \t]*-?[ \t]*(\S.*?)[ \t\r]*$", re.MULTILINE)
+
+# USD per million tokens (input, output), matched by model-name prefix
+_MODEL_PRICING = (
+    ('claude-3-5-haiku', (0.80, 4.00)),
+    ('claude-3-haiku', (0.25, 1.25)),
+    ('claude-3-opus', (15.00, 75.00)),
+    ('claude-opus-4', (15.00, 75.00)),
+    ('claude-3-5-sonnet', (3.00, 15.00)),
+    ('claude-3-7-sonnet', (3.00, 15.00)),
+    ('claude-sonnet-4', (3.00, 15.00)),
+)
+_DEFAULT_PRICING = (3.00, 15.00)
+
+
+def _per_token_pricing(model: str) -> tuple[float, float]:
+    """Look up (input, output) USD cost per single token for a model."""
+    for prefix, (input_mtok, output_mtok) in _MODEL_PRICING:
+        if model.startswith(prefix):
+            break
+    else:
+        input_mtok, output_mtok = _DEFAULT_PRICING
+
+    return input_mtok / 1_000_000, output_mtok / 1_000_000
+
+
+# One client per API key, so every provider instance shares a keep-alive pool
+_CLIENT_CACHE: Dict[str, anthropic.AsyncAnthropic] = {}
+
+
+def _shared_client(api_key: str) -> anthropic.AsyncAnthropic:
+    """Return the shared async client for an API key, creating it on first use."""
+    client = _CLIENT_CACHE.get(api_key)
+    if client is None:
+        client = _CLIENT_CACHE[api_key] = anthropic.AsyncAnthropic(api_key=api_key)
+    return client
+
 
 class ClaudeProvider(AIProvider):
-    """AI provider using Anthropic's Claude API."""
+    """
+    AI provider using Anthropic's Claude API.
+
+    Uses the async client so API round-trips yield to the event loop
+    instead of blocking other Telegram handlers.
+    """
+
+    __slots__ = (
+        "client", "model", "max_tokens", "temperature",
+        "_input_price", "_output_price", "_cache", "_warmup_enabled",
+    )
 
     def __init__(self, api_key: str, model: str, config: Dict[str, Any]):
         """
@@ -28,12 +87,44 @@ class ClaudeProvider(AIProvider):
             config: AI configuration dictionary
         """
         super().__init__(config)
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = _shared_client(api_key)
         self.model = model
         self.max_tokens = config.get('claude', {}).get('max_tokens', 2000)
         self.temperature = config.get('claude', {}).get('temperature', 0.7)
+        self._input_price, self._output_price = _per_token_pricing(model)
+
+        # Parsed analyses keyed by prompt hash, so repeated content skips the API
+        claude_config = config.get('claude', {})
+        self._cache = LRUCache(
+            maxsize=claude_config.get('cache_size', 256),
+            ttl=claude_config.get('cache_ttl', 3600)
+        )
+        self._warmup_enabled = claude_config.get('warmup', True)
+
+        logger.info("Initialized Claude provider with model: %s", model)
+
+    async def warmup(self) -> None:
+        """
+        Open the API connection with a token-count request.
+
+        Pays DNS, TLS and client setup before the first user message
+        arrives. Counting tokens is not billed, unlike a generation.
+        Failures are logged and ignored.
+        """
+        if not self._warmup_enabled:
+            return
 
-        logger.info(f"Initialized Claude provider with model: {model}")
+        start_time = perf_counter()
+        try:
+            # Beta endpoint in the pinned SDK (anthropic 0.40)
+            await self.client.beta.messages.count_tokens(
+                model=self.model,
+                messages=[{"role": "user", "content": "ping"}],
+                betas=["token-counting-2024-11-01"]
+            )
+            logger.info("[Claude] Warm-up complete in %.2fs", perf_counter() - start_time)
+        except Exception as e:
+            logger.warning("[Claude] Warm-up request failed: %s", e)
 
     async def analyze_content(
         self,
@@ -53,8 +144,7 @@ class ClaudeProvider(AIProvider):
         Raises:
             AIProviderError: If analysis fails
         """
-        import time
-        start_time = time.time()
+        start_time = perf_counter()
 
         try:
             # Truncate content if too long
@@ -66,90 +156,118 @@ class ClaudeProvider(AIProvider):
             prompt = prompts.build_analysis_prompt(content, context)
             content_type = context.get('content_type', 'unknown') if context else 'unknown'
 
+            cache_key = hashlib.blake2b(
+                f"{self.model}\0{prompt}".encode('utf-8', 'surrogatepass'),
+                digest_size=16
+            ).digest()
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.info("[Claude] Cache hit for %s - skipping API call", content_type)
+                return copy.deepcopy(cached)
+
             # Call Claude API
             logger.info(
-                f"[Claude] Analyzing {content_type} - "
-                f"Length: {len(content)} chars{' (truncated)' if was_truncated else ''}"
+                "[Claude] Analyzing %s - Length: %d chars%s",
+                content_type, len(content), " (truncated)" if was_truncated else ""
             )
 
-            message = self.client.messages.create(
+            # Stream the response so text is collected as it arrives
+            chunks = []
+            async with self.client.messages.stream(
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
-            )
+            ) as stream:
+                async for text in stream.text_stream:
+                    chunks.append(text)
+                message = await stream.get_final_message()
 
             # Extract response text
-            response_text = message.content[0].text
+            response_text = ''.join(chunks)
 
             # Calculate API metrics
-            elapsed_time = time.time() - start_time
-            input_tokens = message.usage.input_tokens
-            output_tokens = message.usage.output_tokens
+            elapsed_time = perf_counter() - start_time
+            usage = getattr(message, 'usage', None)
+            input_tokens = getattr(usage, 'input_tokens', 0) or 0
+            output_tokens = getattr(usage, 'output_tokens', 0) or 0
 
             logger.info(
-                f"[Claude] API Response - "
-                f"Time: {elapsed_time:.2f}s, "
-                f"Tokens: {input_tokens} in / {output_tokens} out"
+                "[Claude] API Response - Time: %.2fs, Tokens: %d in / %d out",
+                elapsed_time, input_tokens, output_tokens
             )
 
             # Parse JSON response
             analysis = self._parse_json_response(response_text)
+            if analysis is not prompts.FALLBACK_ANALYSIS:
+                self._cache.set(cache_key, copy.deepcopy(analysis))
 
-            # Console log - summary
-            logger.info(
-                f"[Claude] Analysis Complete - "
-                f"Title: '{analysis.get('title', 'N/A')[:50]}', "
-                f"Tags: {len(analysis.get('tags', []))} ({', '.join(analysis.get('tags', [])[:3])}), "
-                f"Folder: '{analysis.get('suggested_folder', 'N/A')}'"
-            )
+            # Look up the list fields once for both log lines below
+            tags = analysis.get('tags') or []
 
-            # Detailed evaluation log
-            eval_data = {
-                "operation": "analyze_content",
-                "provider": "claude",
-                "model": self.model,
-                "content_type": content_type,
-                "input": {
-                    "content_length": original_length,
-                    "truncated": was_truncated,
-                    "content_preview": content[:200] + "..." if len(content) > 200 else content,
-                },
-                "prompt": {
-                    "full_prompt": prompt,
-                    "prompt_length": len(prompt)
-                },
-                "response": {
-                    "raw_response": response_text,
-                    "response_length": len(response_text)
-                },
-                "parsed_analysis": analysis,
-                "metrics": {
-                    "elapsed_time_seconds": elapsed_time,
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "total_tokens": input_tokens + output_tokens,
-                    "cost_estimate_usd": self._estimate_cost(input_tokens, output_tokens)
-                },
-                "quality_indicators": {
-                    "has_title": bool(analysis.get('title')),
-                    "has_summary": bool(analysis.get('summary')),
-                    "num_tags": len(analysis.get('tags', [])),
-                    "has_folder": bool(analysis.get('suggested_folder')),
-                    "num_connections": len(analysis.get('connections', [])),
-                    "num_entities": len(analysis.get('entities', [])),
-                    "parsing_successful": True
+            # Console log - summary
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "[Claude] Analysis Complete - Title: '%s', Tags: %d (%s), Folder: '%s'",
+                    analysis.get('title', 'N/A')[:50],
+                    len(tags),
+                    ', '.join(tags[:3]),
+                    analysis.get('suggested_folder', 'N/A')
+                )
+
+            # Detailed evaluation log (skipped entirely when the level is filtered)
+            if eval_logger.isEnabledFor(logging.INFO):
+                num_connections = len(analysis.get('connections') or [])
+                num_entities = len(analysis.get('entities') or [])
+                prompt_length = len(prompt)
+                response_length = len(response_text)
+                content_preview = content[:200] + "..." if len(content) > 200 else content
+
+                eval_data = {
+                    "operation": "analyze_content",
+                    "provider": "claude",
+                    "model": self.model,
+                    "content_type": content_type,
+                    "input": {
+                        "content_length": original_length,
+                        "truncated": was_truncated,
+                        "content_preview": content_preview,
+                    },
+                    "prompt": {
+                        "full_prompt": prompt,
+                        "prompt_length": prompt_length
+                    },
+                    "response": {
+                        "raw_response": response_text,
+                        "response_length": response_length
+                    },
+                    "parsed_analysis": analysis,
+                    "metrics": {
+                        "elapsed_time_seconds": elapsed_time,
+                        "input_tokens": input_tokens,
+                        "output_tokens": output_tokens,
+                        "total_tokens": input_tokens + output_tokens,
+                        "cost_estimate_usd": self._estimate_cost(input_tokens, output_tokens)
+                    },
+                    "quality_indicators": {
+                        "has_title": bool(analysis.get('title')),
+                        "has_summary": bool(analysis.get('summary')),
+                        "num_tags": len(tags),
+                        "has_folder": bool(analysis.get('suggested_folder')),
+                        "num_connections": num_connections,
+                        "num_entities": num_entities,
+                        "parsing_successful": True
+                    }
                 }
-            }
-            eval_logger.info(json.dumps(eval_data, ensure_ascii=False, indent=2))
+                eval_logger.info(json_utils.dumps(eval_data, pretty=True))
 
             return analysis
 
         except anthropic.APIError as e:
-            elapsed_time = time.time() - start_time
-            logger.error(f"[Claude] API error after {elapsed_time:.2f}s: {e}")
+            elapsed_time = perf_counter() - start_time
+            logger.error("[Claude] API error after %.2fs: %s", elapsed_time, e)
 
             # Log error to evaluation
             error_data = {
@@ -160,12 +278,12 @@ class ClaudeProvider(AIProvider):
                 "error_type": "APIError",
                 "elapsed_time_seconds": elapsed_time
             }
-            eval_logger.error(json.dumps(error_data, ensure_ascii=False))
+            eval_logger.error(json_utils.dumps(error_data))
 
             raise AIProviderError(f"Claude API error: {e}")
         except Exception as e:
-            elapsed_time = time.time() - start_time
-            logger.error(f"[Claude] Provider error after {elapsed_time:.2f}s: {e}")
+            elapsed_time = perf_counter() - start_time
+            logger.error("[Claude] Provider error after %.2fs: %s", elapsed_time, e)
 
             # Log error to evaluation
             error_data = {
@@ -176,7 +294,7 @@ class ClaudeProvider(AIProvider):
                 "error_type": type(e).__name__,
                 "elapsed_time_seconds": elapsed_time
             }
-            eval_logger.error(json.dumps(error_data, ensure_ascii=False))
+            eval_logger.error(json_utils.dumps(error_data))
 
             raise AIProviderError(f"Analysis failed: {e}")
 
@@ -202,23 +320,23 @@ class ClaudeProvider(AIProvider):
             content = self._truncate_content(content)
             prompt = prompts.build_summary_prompt(content, max_length)
 
-            message = self.client.messages.create(
+            message = await self.client.messages.create(
                 model=self.model,
                 max_tokens=500,
                 temperature=self.temperature,
                 messages=[{"role": "user", "content": prompt}]
             )
 
-            summary = message.content[0].text.strip()
-            logger.debug(f"Generated summary: {summary[:100]}...")
+            summary = self._first_text(message).strip()
+            logger.debug("Generated summary: %.100s...", summary)
 
             return summary
 
         except anthropic.APIError as e:
-            logger.error(f"Claude API error during summarization: {e}")
+            logger.error("Claude API error during summarization: %s", e)
             raise AIProviderError(f"Summarization failed: {e}")
         except Exception as e:
-            logger.error(f"Summary generation error: {e}")
+            logger.error("Summary generation error: %s", e)
             raise AIProviderError(f"Summarization failed: {e}")
 
     async def suggest_tags(
@@ -243,24 +361,24 @@ class ClaudeProvider(AIProvider):
             content = self._truncate_content(content)
             prompt = prompts.build_tags_prompt(content, max_tags)
 
-            message = self.client.messages.create(
+            message = await self.client.messages.create(
                 model=self.model,
                 max_tokens=200,
                 temperature=self.temperature,
                 messages=[{"role": "user", "content": prompt}]
             )
 
-            tags_text = message.content[0].text.strip()
-            tags = [tag.strip() for tag in tags_text.split(',')]
+            tags_text = self._first_text(message).strip()
+            tags = _TAG_SPLIT.split(tags_text)
 
-            logger.debug(f"Suggested tags: {tags}")
+            logger.debug("Suggested tags: %s", tags)
             return tags[:max_tags]
 
         except anthropic.APIError as e:
-            logger.error(f"Claude API error during tag suggestion: {e}")
+            logger.error("Claude API error during tag suggestion: %s", e)
             raise AIProviderError(f"Tag suggestion failed: {e}")
         except Exception as e:
-            logger.error(f"Tag suggestion error: {e}")
+            logger.error("Tag suggestion error: %s", e)
             raise AIProviderError(f"Tag suggestion failed: {e}")
 
     async def suggest_folder(
@@ -285,23 +403,23 @@ class ClaudeProvider(AIProvider):
             content = self._truncate_content(content)
             prompt = prompts.build_folder_prompt(content, available_folders)
 
-            message = self.client.messages.create(
+            message = await self.client.messages.create(
                 model=self.model,
                 max_tokens=100,
                 temperature=self.temperature,
                 messages=[{"role": "user", "content": prompt}]
             )
 
-            folder = message.content[0].text.strip().strip('"\'')
-            logger.debug(f"Suggested folder: {folder}")
+            folder = self._first_text(message).strip().strip('"\'')
+            logger.debug("Suggested folder: %s", folder)
 
             return folder
 
         except anthropic.APIError as e:
-            logger.error(f"Claude API error during folder suggestion: {e}")
+            logger.error("Claude API error during folder suggestion: %s", e)
             raise AIProviderError(f"Folder suggestion failed: {e}")
         except Exception as e:
-            logger.error(f"Folder suggestion error: {e}")
+            logger.error("Folder suggestion error: %s", e)
             raise AIProviderError(f"Folder suggestion failed: {e}")
 
     async def find_connections(
@@ -326,41 +444,43 @@ class ClaudeProvider(AIProvider):
             content = self._truncate_content(content)
             prompt = prompts.build_connections_prompt(content, existing_notes)
 
-            message = self.client.messages.create(
+            message = await self.client.messages.create(
                 model=self.model,
                 max_tokens=500,
                 temperature=self.temperature,
                 messages=[{"role": "user", "content": prompt}]
             )
 
-            response_text = message.content[0].text.strip()
+            response_text = self._first_text(message).strip()
 
             # Try to parse as JSON array
             try:
-                connections = json.loads(response_text)
+                connections = json_utils.loads(response_text)
                 if isinstance(connections, list):
-                    logger.debug(f"Found {len(connections)} connections")
+                    logger.debug("Found %d connections", len(connections))
                     return connections
-            except json.JSONDecodeError:
+            except json_utils.JSONDecodeError:
                 pass
 
             # Fallback: split by newlines
-            connections = [
-                line.strip('- ').strip()
-                for line in response_text.split('\n')
-                if line.strip()
-            ]
+            connections = _LINE_SPLIT.findall(response_text)
 
-            logger.debug(f"Found {len(connections)} connections (fallback parsing)")
+            logger.debug("Found %d connections (fallback parsing)", len(connections))
             return connections
 
         except anthropic.APIError as e:
-            logger.error(f"Claude API error during connection finding: {e}")
+            logger.error("Claude API error during connection finding: %s", e)
             raise AIProviderError(f"Connection finding failed: {e}")
         except Exception as e:
-            logger.error(f"Connection finding error: {e}")
+            logger.error("Connection finding error: %s", e)
             raise AIProviderError(f"Connection finding failed: {e}")
 
+    @staticmethod
+    def _first_text(message: Any) -> str:
+        """Return the text of the first content block, or '' if there is none."""
+        blocks = message.content
+        return blocks[0].text if blocks else ""
+
     def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
         """
         Parse JSON from Claude's response, with fallback.
@@ -376,22 +496,12 @@ class ClaudeProvider(AIProvider):
         """
         try:
             # Try direct JSON parsing
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            # Try to extract JSON from markdown code blocks
-            if '```json' in response_text:
-                start = response_text.find('```json') + 7
-                end = response_text.find('```', start)
-                if end > start:
-                    json_str = response_text[start:end].strip()
-                    return json.loads(json_str)
-
-            elif '```' in response_text:
-                start = response_text.find('```') + 3
-                end = response_text.find('```', start)
-                if end > start:
-                    json_str = response_text[start:end].strip()
-                    return json.loads(json_str)
+            return json_utils.loads(response_text)
+        except json_utils.JSONDecodeError:
+            # Try to extract JSON from a markdown code block in one scan
+            match = _CODEBLOCK_RE.search(response_text)
+            if match:
+                return json_utils.loads(match.group(1))
 
             # Fallback: return default structure
             logger.warning("Failed to parse JSON response, using fallback")
@@ -404,7 +514,7 @@ class ClaudeProvider(AIProvider):
                 "raw_response": response_text[:500] + "..." if len(response_text) > 500 else response_text,
                 "fallback_used": True
             }
-            eval_logger.warning(json.dumps(parse_error_data, ensure_ascii=False))
+            eval_logger.warning(json_utils.dumps(parse_error_data))
 
             return prompts.FALLBACK_ANALYSIS
 
@@ -419,12 +529,5 @@ class ClaudeProvider(AIProvider):
         Returns:
             Estimated cost in USD
         """
-        # Claude Sonnet 4 pricing (as of Dec 2024)
-        # Adjust based on your model
-        input_price_per_mtok = 3.00  # $3 per million tokens
-        output_price_per_mtok = 15.00  # $15 per million tokens
-
-        input_cost = (input_tokens / 1_000_000) * input_price_per_mtok
-        output_cost = (output_tokens / 1_000_000) * output_price_per_mtok
-
-        return round(input_cost + output_cost, 6)
+        cost = input_tokens * self._input_price + output_tokens * self._output_price
+        return round(cost, 6)
@@ -1,14 +1,24 @@
 """Ollama AI provider implementation for local LLMs."""
 
-import json
+import asyncio
+import copy
+import hashlib
 import logging
+import math
+import operator
+import threading
+from collections import deque
+from itertools import islice
 from typing import Dict, List, Any, Optional
 import time
 
+import httpx
 import ollama
 
 from .base import AIProvider, AIProviderError
 from . import prompts
+from src.utils import json_utils
+from src.utils.cache import LRUCache
 from src.utils.logger import get_eval_logger
 
 
@@ -16,8 +26,149 @@ logger = logging.getLogger('obsidian_telegram_bot')
 eval_logger = get_eval_logger()
 
 
+# JSON schemas for grammar-constrained output (ollama.output_format: schema)
+_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "summary": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "suggested_folder": {"type": "string"},
+        "connections": {"type": "array", "items": {"type": "string"}},
+        "entities": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["title", "summary", "tags", "suggested_folder", "connections", "entities"],
+}
+_CONNECTIONS_SCHEMA = {"type": "array", "items": {"type": "string"}}
+
+# Characters trimmed from each comma-separated tag and each fallback list line
+_TAG_STRIP = ' \t\r\n"\''
+_LINE_STRIP = '- \t\r'
+
+# Upper bound on connections taken from a plain-text (non-JSON) answer
+_MAX_CONNECTIONS = 20
+
+# Prompt/response text kept in the eval log; the sha256 identifies the full text
+_EVAL_MAX_PROMPT = 2048
+_EVAL_MAX_RESPONSE = 2048
+
+
+def _sha256_hex(text: str) -> str:
+    """Hex digest of a string, for correlating truncated eval log entries."""
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def _unit_vector(values: List[float]) -> Optional[tuple]:
+    """Scale an embedding to unit length so cosine similarity is a dot product."""
+    norm = math.sqrt(sum(v * v for v in values))
+    if not norm:
+        return None
+    return tuple(v / norm for v in values)
+
+
+def _analysis_key(content: str, context: Dict[str, Any]) -> bytes:
+    """
+    Identify an analysis request by its content and the context fields
+    that go into the prompt.
+    """
+    key = hashlib.blake2b(digest_size=16)
+    for part in (
+        content,
+        context.get('content_type', 'unknown'),
+        context.get('source', ''),
+        *(context.get('existing_folders') or ())
+    ):
+        key.update(str(part).encode('utf-8', 'surrogatepass'))
+        key.update(b'\0')
+    return key.digest()
+
+
+class _JsonEndDetector:
+    """
+    Detect the end of the first top-level JSON value in streamed text.
+
+    Tracks bracket depth across chunks, ignoring brackets inside string
+    literals, so a stream can be stopped as soon as the value closes.
+    Text whose first non-space character is not '{' or '[' is not JSON,
+    and is never reported as finished.
+    """
+
+    __slots__ = ("depth", "started", "plain", "in_string", "escaped")
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.plain = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        """Consume a chunk; return True once the top-level value has closed."""
+        if self.plain:
+            return False
+
+        for ch in text:
+            if not self.started:
+                if ch.isspace():
+                    continue
+                if ch != '{' and ch != '[':
+                    self.plain = True
+                    return False
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = self.started
+            elif ch == '{' or ch == '[':
+                self.depth += 1
+                self.started = True
+            elif (ch == '}' or ch == ']') and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+# Stats carried by the final chunk of a streamed generate response
+_STREAM_STAT_KEYS = (
+    'total_duration', 'load_duration', 'prompt_eval_count',
+    'prompt_eval_duration', 'eval_count', 'eval_duration',
+)
+
+
+# One client per server URL, so every provider instance shares a keep-alive pool
+_CLIENT_CACHE: Dict[str, ollama.AsyncClient] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def _shared_client(base_url: str) -> ollama.AsyncClient:
+    """Return the shared async client for an Ollama server, creating it on first use."""
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(base_url)
+        if client is None:
+            client = _CLIENT_CACHE[base_url] = ollama.AsyncClient(
+                host=base_url,
+                timeout=httpx.Timeout(300.0, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+            )
+        return client
+
+
 class OllamaProvider(AIProvider):
-    """AI provider using Ollama for local LLMs."""
+    """
+    AI provider using Ollama for local LLMs.
+
+    Requests go through the async client, so concurrent messages overlap
+    instead of blocking the event loop. At most ``ollama.max_concurrency``
+    generations are in flight at once; how many the server actually runs
+    in parallel is set on the Ollama side with OLLAMA_NUM_PARALLEL (and
+    OLLAMA_MAX_LOADED_MODELS when several models are used).
+    """
 
     def __init__(self, base_url: str, model: str, config: Dict[str, Any]):
         """
@@ -29,18 +180,86 @@ class OllamaProvider(AIProvider):
             config: AI configuration dictionary
         """
         super().__init__(config)
-        self.client = ollama.Client(host=base_url)
+        self.client = _shared_client(base_url)
         self.model = model
+        # Lighter (e.g. q4_K_M quantized) model for summary, tags and folder
+        self.secondary_model = config.get('ollama', {}).get('secondary_model') or model
         self.temperature = config.get('ollama', {}).get('temperature', 0.7)
+        self.max_concurrency = config.get('ollama', {}).get('max_concurrency', 4)
+
+        # Generation options shared by every request. Only tuning keys set in
+        # config are sent, so the model's own defaults apply otherwise.
+        ollama_config = config.get('ollama', {})
+        self._gen_options: Dict[str, Any] = {'temperature': self.temperature}
+        for option in ('num_ctx', 'num_predict', 'top_p', 'top_k', 'repeat_penalty'):
+            if option in ollama_config:
+                self._gen_options[option] = ollama_config[option]
+
+        # Per-task decode limits: short answers stop early instead of rambling
+        self._analysis_options = {**self._gen_options, 'stop': ['\n\n\n']}
+        self._tags_options = {**self._gen_options, 'num_predict': 64, 'stop': ['\n\n']}
+        self._folder_options = {**self._gen_options, 'num_predict': 32, 'stop': ['\n']}
+        self._connections_options = {**self._gen_options, 'num_predict': 256}
+
+        # Created on first use so it belongs to the bot's running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Exact-match cache of parsed analyses, keyed by prompt hash
+        cache_size = ollama_config.get('cache_size', 512)
+        self._cache = LRUCache(maxsize=cache_size, ttl=ollama_config.get('cache_ttl', 3600))
+
+        # Optional near-duplicate cache on content embeddings (unit vectors)
+        self.semantic_cache = ollama_config.get('semantic_cache', False)
+        self.semantic_threshold = ollama_config.get('semantic_cache_threshold', 0.93)
+        self.embed_model = ollama_config.get('embed_model', 'nomic-embed-text')
+        self._semantic_index: deque = deque(maxlen=max(cache_size, 1))
+
+        # Stream JSON responses and stop as soon as the object closes
+        self.stream_json = ollama_config.get('stream_json', True)
+
+        # Constrain JSON answers: "schema" (Ollama 0.5+), "json", or "off".
+        # Plain JSON mode only fits objects, so connections keep free text.
+        output_format = ollama_config.get('output_format', 'json')
+        if output_format == 'schema':
+            self._analysis_format = _ANALYSIS_SCHEMA
+            self._connections_format = _CONNECTIONS_SCHEMA
+        elif output_format == 'json':
+            self._analysis_format = 'json'
+            self._connections_format = ''
+        else:
+            self._analysis_format = ''
+            self._connections_format = ''
+
+        # How long the server keeps the model loaded after each request
+        self.keep_alive = ollama_config.get('keep_alive', '30m')
+
+        # Running analyses by request key, so duplicates share one generation
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+
+        # Connectivity is checked on first use rather than at construction
+        self._connected = False
+        self._connect_lock: Optional[asyncio.Lock] = None
+
+        logger.info("Initialized Ollama provider with model: %s at %s", model, base_url)
+        if self.secondary_model != model:
+            logger.info("Using %s for summary, tag and folder suggestions", self.secondary_model)
+
+    async def warmup(self) -> None:
+        """
+        Load the model into memory before the first request.
 
-        logger.info(f"Initialized Ollama provider with model: {model} at {base_url}")
+        An empty prompt makes Ollama load the model without generating, so
+        the first user message does not pay the model load time. Failures
+        are logged and ignored.
+        """
+        await self._ensure_connected()
 
-        # Test connection
+        start_time = time.time()
         try:
-            self.client.list()
-            logger.info("Successfully connected to Ollama server")
+            await self.client.generate(model=self.model, prompt='', keep_alive=self.keep_alive)
+            logger.info("[Ollama] Model %s loaded in %.2fs", self.model, time.time() - start_time)
         except Exception as e:
-            logger.warning(f"Could not connect to Ollama server: {e}")
+            logger.warning("[Ollama] Warm-up failed: %s", e)
 
     async def analyze_content(
         self,
@@ -50,6 +269,9 @@ class OllamaProvider(AIProvider):
         """
         Analyze content using Ollama and return structured suggestions.
 
+        Identical requests that arrive while one is already running wait
+        for that generation instead of starting their own.
+
         Args:
             content: The content to analyze
             context: Additional context
@@ -60,6 +282,30 @@ class OllamaProvider(AIProvider):
         Raises:
             AIProviderError: If analysis fails
         """
+        context = context or {}
+        key = _analysis_key(content, context)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            logger.info("[Ollama] Joining in-flight analysis of identical content")
+            # Each caller gets its own copy of the shared result
+            return copy.deepcopy(await asyncio.shield(task))
+
+        task = asyncio.ensure_future(self._run_analysis(content, context))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _task: self._inflight.pop(key, None))
+
+        # Shielded so a cancelled caller does not cancel the waiters' request
+        return await asyncio.shield(task)
+
+    async def _run_analysis(
+        self,
+        content: str,
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run one analysis request; see analyze_content."""
+        await self._ensure_connected()
+
         start_time = time.time()
 
         try:
@@ -72,17 +318,35 @@ class OllamaProvider(AIProvider):
             prompt = prompts.build_analysis_prompt(content, context)
             content_type = context.get('content_type', 'unknown') if context else 'unknown'
 
+            cache_key = hashlib.sha256(
+                f"{self.model}\0{prompt}".encode('utf-8', 'surrogatepass')
+            ).digest()
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.info("[Ollama] Cache hit for %s - skipping generation", content_type)
+                return copy.deepcopy(cached)
+
+            embedding = None
+            # Near-duplicates only share an analysis when the model and
+            # the prompt context (content type, folders) match as well
+            semantic_scope = (self.model, _analysis_key('', context or {}))
+            if self.semantic_cache:
+                embedding, cached = await self._semantic_lookup(content, semantic_scope)
+                if cached is not None:
+                    logger.info("[Ollama] Semantic cache hit for %s - skipping generation", content_type)
+                    return copy.deepcopy(cached)
+
             logger.info(
-                f"[Ollama] Analyzing {content_type} - "
-                f"Model: {self.model}, "
-                f"Length: {len(content)} chars{' (truncated)' if was_truncated else ''}"
+                "[Ollama] Analyzing %s - Model: %s, Length: %d chars%s",
+                content_type, self.model, len(content), " (truncated)" if was_truncated else ""
             )
 
             # Call Ollama API
-            response = self.client.generate(
+            response = await self._generate_json(
                 model=self.model,
                 prompt=prompt,
-                options={'temperature': self.temperature}
+                format=self._analysis_format,
+                options=self._analysis_options
             )
 
             # Extract response text
@@ -90,74 +354,87 @@ class OllamaProvider(AIProvider):
 
             # Calculate metrics
             elapsed_time = time.time() - start_time
-            total_duration_s = response.get('total_duration', 0) / 1e9  # nanoseconds to seconds
-            eval_count = response.get('eval_count', 0)
-            eval_duration = response.get('eval_duration', 1)
-            tokens_per_second = eval_count / eval_duration * 1e9 if eval_duration else 0
+            total_duration, eval_count, eval_duration, prompt_eval_count, load_duration = (
+                response.get(key) or 0
+                for key in ('total_duration', 'eval_count', 'eval_duration',
+                            'prompt_eval_count', 'load_duration')
+            )
+            # Durations are in nanoseconds
+            tokens_per_second = eval_count * 1e9 / eval_duration if eval_duration else 0
 
             logger.info(
-                f"[Ollama] Response - "
-                f"Time: {elapsed_time:.2f}s, "
-                f"Speed: {tokens_per_second:.1f} tok/s, "
-                f"Tokens: {eval_count}"
+                "[Ollama] Response - Time: %.2fs, Speed: %.1f tok/s, Tokens: %d",
+                elapsed_time, tokens_per_second, eval_count
             )
 
             # Parse JSON response
             analysis = self._parse_json_response(response_text)
+            if analysis is not prompts.FALLBACK_ANALYSIS:
+                self._cache.set(cache_key, copy.deepcopy(analysis))
+                if embedding is not None:
+                    self._semantic_index.append(
+                        (semantic_scope, embedding, copy.deepcopy(analysis))
+                    )
 
             # Console log - summary
-            logger.info(
-                f"[Ollama] Analysis Complete - "
-                f"Title: '{analysis.get('title', 'N/A')[:50]}', "
-                f"Tags: {len(analysis.get('tags', []))} ({', '.join(analysis.get('tags', [])[:3])}), "
-                f"Folder: '{analysis.get('suggested_folder', 'N/A')}'"
-            )
-
-            # Detailed evaluation log
-            eval_data = {
-                "operation": "analyze_content",
-                "provider": "ollama",
-                "model": self.model,
-                "content_type": content_type,
-                "input": {
-                    "content_length": original_length,
-                    "truncated": was_truncated,
-                    "content_preview": content[:200] + "..." if len(content) > 200 else content,
-                },
-                "prompt": {
-                    "full_prompt": prompt,
-                    "prompt_length": len(prompt)
-                },
-                "response": {
-                    "raw_response": response_text,
-                    "response_length": len(response_text)
-                },
-                "parsed_analysis": analysis,
-                "metrics": {
-                    "elapsed_time_seconds": elapsed_time,
-                    "model_time_seconds": total_duration_s,
-                    "tokens_evaluated": eval_count,
-                    "tokens_per_second": round(tokens_per_second, 2),
-                    "prompt_eval_count": response.get('prompt_eval_count', 0),
-                    "load_duration_seconds": response.get('load_duration', 0) / 1e9
-                },
-                "quality_indicators": {
-                    "has_title": bool(analysis.get('title')),
-                    "has_summary": bool(analysis.get('summary')),
-                    "num_tags": len(analysis.get('tags', [])),
-                    "has_folder": bool(analysis.get('suggested_folder')),
-                    "num_connections": len(analysis.get('connections', [])),
-                    "num_entities": len(analysis.get('entities', [])),
-                    "parsing_successful": True
+            if logger.isEnabledFor(logging.INFO):
+                tags = analysis.get('tags') or []
+                logger.info(
+                    "[Ollama] Analysis Complete - Title: '%s', Tags: %d (%s), Folder: '%s'",
+                    analysis.get('title', 'N/A')[:50],
+                    len(tags),
+                    ', '.join(tags[:3]),
+                    analysis.get('suggested_folder', 'N/A')
+                )
+
+            # Detailed evaluation log (skipped entirely when the level is filtered)
+            if eval_logger.isEnabledFor(logging.INFO):
+                eval_data = {
+                    "operation": "analyze_content",
+                    "provider": "ollama",
+                    "model": self.model,
+                    "content_type": content_type,
+                    "input": {
+                        "content_length": original_length,
+                        "truncated": was_truncated,
+                        "content_preview": content[:200] + "..." if len(content) > 200 else content,
+                    },
+                    "prompt": {
+                        "prompt_sha256": _sha256_hex(prompt),
+                        "prompt_head": prompt[:_EVAL_MAX_PROMPT],
+                        "prompt_length": len(prompt)
+                    },
+                    "response": {
+                        "response_sha256": _sha256_hex(response_text),
+                        "response_head": response_text[:_EVAL_MAX_RESPONSE],
+                        "response_length": len(response_text)
+                    },
+                    "parsed_analysis": analysis,
+                    "metrics": {
+                        "elapsed_time_seconds": elapsed_time,
+                        "model_time_seconds": total_duration / 1e9,
+                        "tokens_evaluated": eval_count,
+                        "tokens_per_second": round(tokens_per_second, 2),
+                        "prompt_eval_count": prompt_eval_count,
+                        "load_duration_seconds": load_duration / 1e9
+                    },
+                    "quality_indicators": {
+                        "has_title": bool(analysis.get('title')),
+                        "has_summary": bool(analysis.get('summary')),
+                        "num_tags": len(analysis.get('tags', [])),
+                        "has_folder": bool(analysis.get('suggested_folder')),
+                        "num_connections": len(analysis.get('connections', [])),
+                        "num_entities": len(analysis.get('entities', [])),
+                        "parsing_successful": True
+                    }
                 }
-            }
-            eval_logger.info(json.dumps(eval_data, ensure_ascii=False, indent=2))
+                eval_logger.info(json_utils.dumps(eval_data, pretty=True))
 
             return analysis
 
         except ollama.ResponseError as e:
             elapsed_time = time.time() - start_time
-            logger.error(f"[Ollama] API error after {elapsed_time:.2f}s: {e}")
+            logger.error("[Ollama] API error after %.2fs: %s", elapsed_time, e)
 
             # Log error to evaluation
             error_data = {
@@ -168,12 +445,12 @@ class OllamaProvider(AIProvider):
                 "error_type": "ResponseError",
                 "elapsed_time_seconds": elapsed_time
             }
-            eval_logger.error(json.dumps(error_data, ensure_ascii=False))
+            eval_logger.error(json_utils.dumps(error_data))
 
             raise AIProviderError(f"Ollama API error: {e}")
         except Exception as e:
             elapsed_time = time.time() - start_time
-            logger.error(f"[Ollama] Provider error after {elapsed_time:.2f}s: {e}")
+            logger.error("[Ollama] Provider error after %.2fs: %s", elapsed_time, e)
 
             # Log error to evaluation
             error_data = {
@@ -184,7 +461,7 @@ class OllamaProvider(AIProvider):
                 "error_type": type(e).__name__,
                 "elapsed_time_seconds": elapsed_time
             }
-            eval_logger.error(json.dumps(error_data, ensure_ascii=False))
+            eval_logger.error(json_utils.dumps(error_data))
 
             raise AIProviderError(f"Analysis failed: {e}")
 
@@ -206,26 +483,28 @@ class OllamaProvider(AIProvider):
         Raises:
             AIProviderError: If summarization fails
         """
+        await self._ensure_connected()
+
         try:
             content = self._truncate_content(content)
             prompt = prompts.build_summary_prompt(content, max_length)
 
-            response = self.client.generate(
-                model=self.model,
+            response = await self._generate(
+                model=self.secondary_model,
                 prompt=prompt,
-                options={'temperature': self.temperature}
+                options={**self._gen_options, 'num_predict': max(64, (max_length or 120) * 2)}
             )
 
             summary = response['response'].strip()
-            logger.debug(f"Generated summary: {summary[:100]}...")
+            logger.debug("Generated summary: %.100s...", summary)
 
             return summary
 
         except ollama.ResponseError as e:
-            logger.error(f"Ollama API error during summarization: {e}")
+            logger.error("Ollama API error during summarization: %s", e)
             raise AIProviderError(f"Summarization failed: {e}")
         except Exception as e:
-            logger.error(f"Summary generation error: {e}")
+            logger.error("Summary generation error: %s", e)
             raise AIProviderError(f"Summarization failed: {e}")
 
     async def suggest_tags(
@@ -246,27 +525,33 @@ class OllamaProvider(AIProvider):
         Raises:
             AIProviderError: If tag suggestion fails
         """
+        await self._ensure_connected()
+
         try:
             content = self._truncate_content(content)
             prompt = prompts.build_tags_prompt(content, max_tags)
 
-            response = self.client.generate(
-                model=self.model,
+            response = await self._generate(
+                model=self.secondary_model,
                 prompt=prompt,
-                options={'temperature': self.temperature}
+                options=self._tags_options
             )
 
             tags_text = response['response'].strip()
-            tags = [tag.strip() for tag in tags_text.split(',')]
+            # Stop stripping once max_tags non-empty tags have been found
+            tags = list(islice(
+                filter(None, (tag.strip(_TAG_STRIP) for tag in tags_text.split(','))),
+                max_tags
+            ))
 
-            logger.debug(f"Suggested tags: {tags}")
-            return tags[:max_tags]
+            logger.debug("Suggested tags: %s", tags)
+            return tags
 
         except ollama.ResponseError as e:
-            logger.error(f"Ollama API error during tag suggestion: {e}")
+            logger.error("Ollama API error during tag suggestion: %s", e)
             raise AIProviderError(f"Tag suggestion failed: {e}")
         except Exception as e:
-            logger.error(f"Tag suggestion error: {e}")
+            logger.error("Tag suggestion error: %s", e)
             raise AIProviderError(f"Tag suggestion failed: {e}")
 
     async def suggest_folder(
@@ -287,26 +572,28 @@ class OllamaProvider(AIProvider):
         Raises:
             AIProviderError: If folder suggestion fails
         """
+        await self._ensure_connected()
+
         try:
             content = self._truncate_content(content)
             prompt = prompts.build_folder_prompt(content, available_folders)
 
-            response = self.client.generate(
-                model=self.model,
+            response = await self._generate(
+                model=self.secondary_model,
                 prompt=prompt,
-                options={'temperature': self.temperature}
+                options=self._folder_options
             )
 
             folder = response['response'].strip().strip('"\'')
-            logger.debug(f"Suggested folder: {folder}")
+            logger.debug("Suggested folder: %s", folder)
 
             return folder
 
         except ollama.ResponseError as e:
-            logger.error(f"Ollama API error during folder suggestion: {e}")
+            logger.error("Ollama API error during folder suggestion: %s", e)
             raise AIProviderError(f"Folder suggestion failed: {e}")
         except Exception as e:
-            logger.error(f"Folder suggestion error: {e}")
+            logger.error("Folder suggestion error: %s", e)
             raise AIProviderError(f"Folder suggestion failed: {e}")
 
     async def find_connections(
@@ -327,44 +614,175 @@ class OllamaProvider(AIProvider):
         Raises:
             AIProviderError: If connection finding fails
         """
+        await self._ensure_connected()
+
         try:
             content = self._truncate_content(content)
             prompt = prompts.build_connections_prompt(content, existing_notes)
 
-            response = self.client.generate(
+            response = await self._generate_json(
                 model=self.model,
                 prompt=prompt,
-                options={'temperature': self.temperature}
+                format=self._connections_format,
+                options=self._connections_options
             )
 
             response_text = response['response'].strip()
 
             # Try to parse as JSON array
             try:
-                connections = json.loads(response_text)
+                connections = json_utils.loads(response_text)
                 if isinstance(connections, list):
-                    logger.debug(f"Found {len(connections)} connections")
+                    logger.debug("Found %d connections", len(connections))
                     return connections
-            except json.JSONDecodeError:
+            except json_utils.JSONDecodeError:
                 pass
 
             # Fallback: split by newlines
-            connections = [
-                line.strip('- ').strip()
-                for line in response_text.split('\n')
-                if line.strip()
-            ]
+            connections = list(islice(
+                filter(None, (line.strip(_LINE_STRIP) for line in response_text.split('\n'))),
+                _MAX_CONNECTIONS
+            ))
 
-            logger.debug(f"Found {len(connections)} connections (fallback parsing)")
+            logger.debug("Found %d connections (fallback parsing)", len(connections))
             return connections
 
         except ollama.ResponseError as e:
-            logger.error(f"Ollama API error during connection finding: {e}")
+            logger.error("Ollama API error during connection finding: %s", e)
             raise AIProviderError(f"Connection finding failed: {e}")
         except Exception as e:
-            logger.error(f"Connection finding error: {e}")
+            logger.error("Connection finding error: %s", e)
             raise AIProviderError(f"Connection finding failed: {e}")
 
+    async def _ensure_connected(self) -> None:
+        """
+        Probe the Ollama server once, the first time the provider is used.
+
+        The result is only logged: an unreachable server surfaces as an
+        error on the actual request.
+        """
+        if self._connected:
+            return
+
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self._connected:
+                return
+            try:
+                await asyncio.wait_for(self.client.list(), timeout=2.0)
+                logger.info("Successfully connected to Ollama server")
+            except Exception as e:
+                logger.warning("Could not connect to Ollama server: %r", e)
+            self._connected = True
+
+    async def _semantic_lookup(self, content: str, scope: tuple) -> tuple:
+        """
+        Find a cached analysis of near-identical content.
+
+        Args:
+            content: Content about to be analyzed
+            scope: (model, context key); only entries stored under the
+                same scope can match
+
+        Returns:
+            (embedding, analysis) where embedding is the unit vector for
+            the content (None if embedding failed) and analysis is the best
+            cached match above the similarity threshold, or None
+        """
+        try:
+            response = await self.client.embed(model=self.embed_model, input=content[:2000])
+            embedding = _unit_vector(response['embeddings'][0])
+        except Exception as e:
+            logger.debug("Embedding for semantic cache failed: %s", e)
+            return None, None
+
+        if embedding is None:
+            return None, None
+
+        best_score = self.semantic_threshold
+        best_analysis = None
+        for entry_scope, vector, analysis in self._semantic_index:
+            if entry_scope != scope:
+                continue
+            score = sum(map(operator.mul, embedding, vector))
+            if score >= best_score:
+                best_score, best_analysis = score, analysis
+
+        return embedding, best_analysis
+
+    async def _generate(self, **kwargs: Any) -> Any:
+        """
+        Run a generate request, limited to max_concurrency at a time.
+
+        Args:
+            **kwargs: Arguments passed through to AsyncClient.generate
+
+        Returns:
+            Ollama generate response
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        kwargs.setdefault('keep_alive', self.keep_alive)
+        async with self._semaphore:
+            return await self.client.generate(**kwargs)
+
+    async def _generate_json(self, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Run a generate request whose answer is a single JSON value.
+
+        With streaming enabled and a format constraint set, the request
+        is cut off once the first top-level object or array is complete,
+        so trailing chatter is never decoded. Unconstrained (free-text)
+        requests always run to completion, since brackets in prose, such
+        as [[wikilinks]], would end them early. If the stream ends early,
+        timing stats are estimated from the chunks received.
+
+        Args:
+            **kwargs: Arguments passed through to AsyncClient.generate
+
+        Returns:
+            Dict with 'response' text and whatever timing stats are known
+        """
+        if not self.stream_json or not kwargs.get('format'):
+            return await self._generate(**kwargs)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        kwargs.setdefault('keep_alive', self.keep_alive)
+        chunks = []
+        detector = _JsonEndDetector()
+        last_chunk = None
+        start_ns = time.perf_counter_ns()
+
+        async with self._semaphore:
+            stream = await self.client.generate(stream=True, **kwargs)
+            try:
+                async for chunk in stream:
+                    last_chunk = chunk
+                    text = chunk['response']
+                    chunks.append(text)
+                    if detector.feed(text):
+                        break
+            finally:
+                aclose = getattr(stream, 'aclose', None)
+                if aclose is not None:
+                    await aclose()
+
+        response: Dict[str, Any] = {'response': ''.join(chunks)}
+        if last_chunk is not None and last_chunk.get('done'):
+            for key in _STREAM_STAT_KEYS:
+                response[key] = last_chunk.get(key) or 0
+        else:
+            # Stopped before the final stats chunk; roughly one token per chunk
+            elapsed_ns = time.perf_counter_ns() - start_ns
+            response.update(total_duration=elapsed_ns, eval_count=len(chunks), eval_duration=elapsed_ns)
+
+        return response
+
     def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
         """
         Parse JSON from Ollama's response, with fallback.
@@ -380,31 +798,17 @@ class OllamaProvider(AIProvider):
         """
         try:
             # Try direct JSON parsing
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            # Try to extract JSON from markdown code blocks
-            if '```json' in response_text:
-                start = response_text.find('```json') + 7
-                end = response_text.find('```', start)
-                if end > start:
-                    json_str = response_text[start:end].strip()
-                    return json.loads(json_str)
-
-            elif '```' in response_text:
-                start = response_text.find('```') + 3
-                end = response_text.find('```', start)
-                if end > start:
-                    json_str = response_text[start:end].strip()
-                    return json.loads(json_str)
-
-            # Final attempt: look for { } boundaries
+            return json_utils.loads(response_text)
+        except json_utils.JSONDecodeError:
+            # Decode the object starting at the first brace in one pass,
+            # which also skips markdown fences and trailing text
             start = response_text.find('{')
-            end = response_text.rfind('}')
-            if start >= 0 and end > start:
+            if start >= 0:
                 try:
-                    json_str = response_text[start:end+1]
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
+                    parsed, _ = json_utils.raw_decode(response_text, start)
+                    if isinstance(parsed, dict):
+                        return parsed
+                except json_utils.JSONDecodeError:
                     pass
 
             # Fallback: return default structure
@@ -418,6 +822,6 @@ class OllamaProvider(AIProvider):
                 "raw_response": response_text[:500] + "..." if len(response_text) > 500 else response_text,
                 "fallback_used": True
             }
-            eval_logger.warning(json.dumps(parse_error_data, ensure_ascii=False))
+            eval_logger.warning(json_utils.dumps(parse_error_data))
 
             return prompts.FALLBACK_ANALYSIS
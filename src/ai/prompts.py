@@ -1,52 +1,26 @@
 """AI prompt templates for content analysis."""
 
-from typing import Dict, List, Optional, Any
+import functools
+from typing import Dict, List, Optional, Any, Tuple
 
 
-def build_analysis_prompt(
-    content: str,
-    context: Optional[Dict[str, Any]] = None
-) -> str:
-    """
-    Build a comprehensive content analysis prompt for AI.
-
-    Args:
-        content: The content to analyze
-        context: Additional context (source, existing folders, etc.)
-
-    Returns:
-        Formatted prompt string
-    """
-    context = context or {}
-    source = context.get('source', 'Telegram')
-    content_type = context.get('content_type', 'text')
-    existing_folders = context.get('existing_folders', [])
-
-    folders_info = ""
-    if existing_folders:
-        folders_info = f"\n- Existing folders in vault: {', '.join(existing_folders[:20])}"
-        if len(existing_folders) > 20:
-            folders_info += " (and more...)"
-
-    prompt = f"""You are an intelligent assistant helping organize information for an INTP researcher who collects lots of information but needs help with structure and connections.
+_ANALYSIS_HEADER = """You are an intelligent assistant helping organize information for an INTP researcher who collects lots of information but needs help with structure and connections.
 
 Content to analyze:
-{content}
+"""
 
-Context:
-- Source: {source}
-- Content type: {content_type}{folders_info}
+_ANALYSIS_FOOTER = """
 
 Please analyze this content and provide a structured response in JSON format with the following fields:
 
-{{
+{
   "title": "A concise, descriptive title (3-8 words)",
   "summary": "A 2-3 sentence summary capturing the key points and insights",
   "tags": ["tag1", "tag2", "tag3"],
   "suggested_folder": "Recommended folder path (e.g., 'Knowledge/Tech', 'Ideas', 'Inbox')",
   "connections": ["Connection or theme 1", "Connection or theme 2"],
   "entities": ["Entity1", "Entity2", "Entity3"]
-}}
+}
 
 Guidelines:
 - Title: Should be specific and searchable, not generic
@@ -64,9 +38,53 @@ For an INTP organizing notes:
 
 Respond ONLY with valid JSON, no additional text."""
 
-    return prompt
 
+@functools.lru_cache(maxsize=128)
+def _folders_info(folders: Tuple[str, ...], has_more: bool) -> str:
+    """Context line listing vault folders; the folder list rarely changes."""
+    info = f"\n- Existing folders in vault: {', '.join(folders)}"
+    if has_more:
+        info += " (and more...)"
+    return info
+
+
+def build_analysis_prompt(
+    content: str,
+    context: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a comprehensive content analysis prompt for AI.
+
+    The static instructions are module-level constants; only the content
+    and context lines are assembled per call.
+
+    Args:
+        content: The content to analyze
+        context: Additional context (source, existing folders, etc.)
 
+    Returns:
+        Formatted prompt string
+    """
+    context = context or {}
+    source = context.get('source', 'Telegram')
+    content_type = context.get('content_type', 'text')
+    existing_folders = context.get('existing_folders', [])
+
+    folders_info = ""
+    if existing_folders:
+        folders_info = _folders_info(tuple(existing_folders[:20]), len(existing_folders) > 20)
+
+    return "".join((
+        _ANALYSIS_HEADER,
+        content,
+        "\n\nContext:\n- Source: ", source,
+        "\n- Content type: ", content_type,
+        folders_info,
+        _ANALYSIS_FOOTER,
+    ))
+
+
+@functools.lru_cache(maxsize=32)
 def build_summary_prompt(content: str, max_length: Optional[int] = None) -> str:
     """
     Build a prompt for content summarization.
@@ -88,6 +106,7 @@ Content:
 Provide a clear, concise summary that captures the essence of the content."""
 
 
+@functools.lru_cache(maxsize=32)
 def build_tags_prompt(content: str, max_tags: int = 5) -> str:
     """
     Build a prompt for tag suggestion.
@@ -111,6 +130,15 @@ Respond with ONLY a comma-separated list of tags, nothing else.
 Example: technology, machine-learning, philosophy, productivity"""
 
 
+@functools.lru_cache(maxsize=64)
+def _folders_context(folders: Tuple[str, ...], has_more: bool) -> str:
+    """Folder list and guidance for the folder prompt, memoized like _folders_info."""
+    context = f"\n\nExisting folders: {', '.join(folders)}"
+    if has_more:
+        context += " (and more...)"
+    return context + "\n\nPrefer using existing folders when they match, or suggest a new folder path if this content represents a distinct topic."
+
+
 def build_folder_prompt(
     content: str,
     available_folders: Optional[List[str]] = None
@@ -127,11 +155,7 @@ def build_folder_prompt(
     """
     folders_context = ""
     if available_folders:
-        folders_list = ", ".join(available_folders[:30])
-        folders_context = f"\n\nExisting folders: {folders_list}"
-        if len(available_folders) > 30:
-            folders_context += " (and more...)"
-        folders_context += "\n\nPrefer using existing folders when they match, or suggest a new folder path if this content represents a distinct topic."
+        folders_context = _folders_context(tuple(available_folders[:30]), len(available_folders) > 30)
 
     return f"""Suggest the best folder location for this content in an Obsidian vault.{folders_context}
 
@@ -141,6 +165,18 @@ Content:
 Respond with ONLY the folder path (e.g., "Knowledge/Technology" or "Ideas" or "Inbox"). Nothing else."""
 
 
+@functools.lru_cache(maxsize=64)
+def _notes_context(notes: Tuple[Tuple[str, Tuple[str, ...]], ...], has_more: bool) -> str:
+    """Existing-notes block for the connections prompt, keyed by (title, tags) pairs."""
+    notes_list = "\n".join(
+        f"- {title} (tags: {', '.join(tags)})" for title, tags in notes
+    )
+    context = f"\n\nSome existing notes in the vault:\n{notes_list}"
+    if has_more:
+        context += "\n(and more...)"
+    return context
+
+
 def build_connections_prompt(
     content: str,
     existing_notes: Optional[List[Dict[str, str]]] = None
@@ -157,13 +193,11 @@ def build_connections_prompt(
     """
     notes_context = ""
     if existing_notes:
-        notes_list = "\n".join([
-            f"- {note.get('title', 'Untitled')} (tags: {', '.join(note.get('tags', []))})"
+        notes_key = tuple(
+            (note.get('title', 'Untitled'), tuple(note.get('tags', ())))
             for note in existing_notes[:20]
-        ])
-        notes_context = f"\n\nSome existing notes in the vault:\n{notes_list}"
-        if len(existing_notes) > 20:
-            notes_context += "\n(and more...)"
+        )
+        notes_context = _notes_context(notes_key, len(existing_notes) > 20)
 
     return f"""Identify potential connections or related themes for this new content.{notes_context}
 
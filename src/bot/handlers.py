@@ -1,11 +1,12 @@
 """Telegram message handlers."""
 
+import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from pathlib import Path
 
-from telegram import Update
+from telegram import MessageEntity, Update
 from telegram.ext import ContextTypes
 
 from src.processors.content_analyzer import ContentAnalyzer
@@ -18,6 +19,12 @@ from src.obsidian.note_finder import NoteFinder
 
 logger = logging.getLogger('obsidian_telegram_bot')
 
+_VOICE_PREVIEW_NOTE = "Note: Transcription not yet implemented"
+_VOICE_PREVIEW = f"✓ Voice note saved\n\n{_VOICE_PREVIEW_NOTE}"
+_VOICE_PREVIEW_ENTITIES = (
+    (MessageEntity.ITALIC, len(_VOICE_PREVIEW) - len(_VOICE_PREVIEW_NOTE), len(_VOICE_PREVIEW_NOTE)),
+)
+
 
 class MessageHandlers:
     """Telegram message handlers for the bot."""
@@ -52,43 +59,98 @@ class MessageHandlers:
         self.article_processor = article_processor
         self.config = config
 
-        self.allowed_users = config.get('telegram', {}).get('allowed_users')
+        # Checked on every update, so store as a set for O(1) lookups
+        allowed_users = config.get('telegram', {}).get('allowed_users')
+        self.allowed_users = None if allowed_users is None else frozenset(allowed_users)
         self.send_preview = config.get('bot', {}).get('send_preview', True)
 
-    def _reconstruct_text_with_urls(self, text: str, entities) -> str:
+    def _process_entities(self, text: str, entities) -> Tuple[str, List[str]]:
         """
-        Reconstruct text with inline URLs made visible.
+        Collect entity URLs and make inline URLs visible in one pass.
 
         Converts Telegram entities like [clickable text](hidden_url)
-        into Markdown format: [clickable text](url)
+        into Markdown format: [clickable text](url), and gathers the URLs
+        of both visible ('url') and hidden ('text_link') links.
 
         Args:
             text: Original message text
             entities: Message entities from Telegram
 
         Returns:
-            Text with URLs made visible in Markdown format
+            Tuple of (text with URLs made visible in Markdown format,
+            URLs found in entities in message order)
+        """
+        parts = []
+        urls = []
+        pos = 0
+
+        for entity in sorted(entities, key=lambda e: e.offset):
+            offset = entity.offset
+            end = offset + entity.length
+
+            # URL entity - visible URL in text
+            if entity.type == 'url':
+                urls.append(text[offset:end])
+
+            # Text link entity - clickable text with hidden URL
+            elif entity.type == 'text_link':
+                urls.append(entity.url)
+                if offset >= pos:
+                    parts.append(text[pos:offset])
+                    parts.append(f"[{text[offset:end]}]({entity.url})")
+                    pos = end
+
+        if not parts:
+            return text, urls
+
+        parts.append(text[pos:])
+        return ''.join(parts), urls
+
+    async def _create_and_save_note(
+        self,
+        analysis: Dict[str, Any],
+        content: str,
+        metadata: Dict[str, Any]
+    ) -> None:
         """
-        # Build list of (offset, length, replacement) tuples
-        replacements = []
+        Format a note and write it into the vault from a worker thread.
 
-        for entity in entities:
-            if entity.type == 'text_link':
-                # Extract the text that was clickable
-                entity_text = text[entity.offset:entity.offset + entity.length]
-                # Create markdown link
-                markdown_link = f"[{entity_text}]({entity.url})"
-                replacements.append((entity.offset, entity.length, markdown_link))
+        The note is streamed into the file section by section, so long
+        articles or OCR output are neither formatted on the event loop
+        nor held in memory twice.
 
-        # Sort by offset in reverse so we don't mess up positions
-        replacements.sort(key=lambda x: x[0], reverse=True)
+        Args:
+            analysis: AI analysis results
+            content: Note content
+            metadata: Note metadata
+        """
+        await asyncio.to_thread(
+            self.note_creator.stream_note,
+            analysis,
+            content,
+            metadata,
+            self.vault.open_note
+        )
 
-        # Apply replacements
-        result = text
-        for offset, length, replacement in replacements:
-            result = result[:offset] + replacement + result[offset + length:]
+    async def _send_preview(
+        self,
+        message,
+        analysis: Dict[str, Any],
+        metadata: Dict[str, Any]
+    ) -> None:
+        """
+        Reply with a short summary of the saved note.
 
-        return result
+        Args:
+            message: Telegram message to reply to
+            analysis: AI analysis results
+            metadata: Note metadata
+        """
+        text, spans = self.note_creator.create_preview(analysis, metadata)
+        await message.reply_text(
+            text,
+            entities=[MessageEntity(kind, offset, length) for kind, offset, length in spans]
+        )
 
     def _check_user_authorization(self, user_id: int) -> bool:
         """
@@ -131,29 +193,23 @@ class MessageHandlers:
             text = message.text
             timestamp = message.date
 
-            # Extract URLs from text content
-            urls_from_text = self.article_processor.extract_urls(text)
-
-            # Extract URLs from message entities (inline links)
-            urls_from_entities = []
+            # Extract URLs from message entities (inline links) and
+            # reconstruct text with visible URLs in the same sweep
             if message.entities:
-                for entity in message.entities:
-                    # URL entity - visible URL in text
-                    if entity.type == 'url':
-                        url_text = text[entity.offset:entity.offset + entity.length]
-                        urls_from_entities.append(url_text)
-                    # Text link entity - clickable text with hidden URL
-                    elif entity.type == 'text_link':
-                        urls_from_entities.append(entity.url)
-
-            # Combine all URLs (remove duplicates)
-            urls = list(dict.fromkeys(urls_from_text + urls_from_entities))
-
-            # Reconstruct text with visible URLs for entities
-            if message.entities:
-                text_with_urls = self._reconstruct_text_with_urls(text, message.entities)
+                text_with_urls, urls = self._process_entities(
+                    text, message.entities
+                )
             else:
-                text_with_urls = text
+                text_with_urls, urls = text, None
+
+            # Telegram already marks visible links as entities; only scan
+            # the text itself when it found none
+            if not urls:
+                urls = self.article_processor.extract_urls(text)
+
+            # Remove duplicates
+            if len(urls) > 1:
+                urls = list(dict.fromkeys(urls))
 
             if urls:
                 await self._handle_text_with_urls(
@@ -228,18 +284,11 @@ class MessageHandlers:
         }
 
         # Create and save note
-        note_content, filename = self.note_creator.create_note(
-            analysis,
-            combined_content,
-            metadata
-        )
-
-        await self.vault.save_note(note_content, filename)
+        await self._create_and_save_note(analysis, combined_content, metadata)
 
         # Send preview
         if self.send_preview:
-            preview = self.note_creator.create_preview(analysis, metadata)
-            await message.reply_text(preview, parse_mode='Markdown')
+            await self._send_preview(message, analysis, metadata)
 
     async def _handle_plain_text(
         self,
@@ -268,18 +317,11 @@ class MessageHandlers:
         }
 
         # Create and save note
-        note_content, filename = self.note_creator.create_note(
-            analysis,
-            text,
-            metadata
-        )
-
-        await self.vault.save_note(note_content, filename)
+        await self._create_and_save_note(analysis, text, metadata)
 
         # Send preview
         if self.send_preview:
-            preview = self.note_creator.create_preview(analysis, metadata)
-            await message.reply_text(preview, parse_mode='Markdown')
+            await self._send_preview(message, analysis, metadata)
 
     async def handle_photo_message(
         self,
@@ -308,19 +350,19 @@ class MessageHandlers:
 
             # Download photo
             file = await photo.get_file()
-            file_path, file_data = await self.media_processor.download_telegram_file(
+            file_path = await self.media_processor.download_telegram_file(
                 file,
                 context.bot
             )
 
-            # Process OCR
-            ocr_result = await self.media_processor.process_image(str(file_path))
-
-            # Save photo to vault
+            # Run OCR and save photo to vault concurrently
             media_filename = self.media_processor.generate_media_filename(
                 media_type='photo'
             )
-            saved_path = await self.vault.save_attachment(file_data, media_filename)
+            ocr_result, saved_path = await asyncio.gather(
+                self.media_processor.process_image(str(file_path)),
+                self.vault.import_attachment(file_path, media_filename)
+            )
 
             # Combine caption and OCR text
             caption = message.caption or ""
@@ -360,20 +402,11 @@ class MessageHandlers:
             }
 
             # Create and save note
-            note_content, filename = self.note_creator.create_note(
-                analysis,
-                content,
-                metadata
-            )
-
-            await self.vault.save_note(note_content, filename)
+            await self._create_and_save_note(analysis, content, metadata)
 
             # Send preview
             if self.send_preview:
-                preview = self.note_creator.create_preview(analysis, metadata)
-                if ocr_result.get('has_text'):
-                    preview += f"\n\n_OCR: {len(ocr_text)} characters extracted_"
-                await message.reply_text(preview, parse_mode='Markdown')
+                await self._send_preview(message, analysis, metadata)
 
             # Clean up temp file
             try:
@@ -436,18 +469,12 @@ class MessageHandlers:
                 'media_type': 'voice'
             }
 
-            note_content, filename = self.note_creator.create_note(
-                analysis,
-                content,
-                metadata
-            )
-
-            await self.vault.save_note(note_content, filename)
+            await self._create_and_save_note(analysis, content, metadata)
 
             if self.send_preview:
                 await message.reply_text(
-                    f"✓ Voice note saved\n\n_Note: Transcription not yet implemented_",
-                    parse_mode='Markdown'
+                    _VOICE_PREVIEW,
+                    entities=[MessageEntity(*span) for span in _VOICE_PREVIEW_ENTITIES]
                 )
 
         except Exception as e:
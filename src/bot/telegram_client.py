@@ -47,8 +47,19 @@ class TelegramBot:
         """
         logger.info("Creating Telegram bot application")
 
+        # Handle several updates at once so a slow OCR run or article
+        # fetch does not hold up everyone else's messages
+        concurrent_updates = int(self.config.get('bot', {}).get('concurrent_updates', 8))
+
         # Create application
-        self.application = Application.builder().token(self.bot_token).build()
+        self.application = (
+            Application.builder()
+            .token(self.bot_token)
+            .concurrent_updates(max(concurrent_updates, 1))
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
 
         # Register command handlers
         self.application.add_handler(
@@ -84,6 +95,14 @@ class TelegramBot:
 
         return self.application
 
+    async def _post_init(self, application: Application) -> None:
+        """Warm up the AI provider on the bot's event loop before polling starts."""
+        await self.handlers.analyzer.warmup()
+
+    async def _post_shutdown(self, application: Application) -> None:
+        """Close the article HTTP client while the bot's event loop is still running."""
+        await self.handlers.article_processor.aclose()
+
     async def start(self) -> None:
         """Start the bot with polling."""
         if not self.application:
@@ -1,13 +1,27 @@
 """Note creation and formatting for Obsidian."""
 
+import io
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Callable, ContextManager, TextIO
 import re
 
 logger = logging.getLogger('obsidian_telegram_bot')
 
+# Filename sanitization: drop punctuation, then collapse whitespace,
+# underscores and hyphen runs into a single hyphen
+_UNSAFE_CHARS_RE = re.compile(r'[^\w\s-]')
+_SEPARATORS_RE = re.compile(r'[\s_-]+')
+
+# Fixed leading block of every note's frontmatter
+_FRONTMATTER_HEADER = (
+    "---\n"
+    "created: {created}\n"
+    "source: {source}\n"
+    "source_type: {source_type}\n"
+)
+
 
 class NoteCreator:
     """Creates formatted Obsidian notes from analyzed content."""
@@ -41,39 +55,99 @@ class NoteCreator:
         Returns:
             Tuple of (note_content, filename)
         """
-        timestamp = metadata.get('timestamp', datetime.now())
+        created, filename = self._prepare_note(analysis, metadata)
 
-        # Generate filename
-        filename = self._generate_filename(
-            title=analysis.get('title', 'Untitled'),
-            timestamp=timestamp
-        )
+        buf = io.StringIO()
+        self._write_note(buf, analysis, content, metadata, created)
+        note_content = buf.getvalue()
 
-        # Build frontmatter
-        frontmatter = self._build_frontmatter(analysis, metadata)
+        logger.debug("Created note: %s", filename)
+        return note_content, filename
 
-        # Build main content
-        note_body = self._build_note_body(analysis, content, metadata)
+    def stream_note(
+        self,
+        analysis: Dict[str, Any],
+        content: str,
+        metadata: Dict[str, Any],
+        open_note: Callable[[str], ContextManager[TextIO]]
+    ) -> str:
+        """
+        Write a formatted Obsidian note straight into a file (blocking).
 
-        # Combine
-        note_content = f"{frontmatter}\n{note_body}"
+        Produces the same text as create_note, but writes it section by
+        section instead of building the whole note in memory first.
 
-        logger.debug(f"Created note: {filename}")
-        return note_content, filename
+        Args:
+            analysis: AI analysis results (title, tags, summary, etc.)
+            content: Original message content
+            metadata: Additional metadata (source, timestamp, user_id, etc.)
+            open_note: Called with the filename, returns a context
+                manager yielding a writable text file
+                (e.g. VaultManager.open_note)
+
+        Returns:
+            Filename the note was created under
+        """
+        created, filename = self._prepare_note(analysis, metadata)
+
+        with open_note(filename) as fp:
+            self._write_note(fp, analysis, content, metadata, created)
+
+        logger.debug("Created note: %s", filename)
+        return filename
+
+    def _prepare_note(
+        self,
+        analysis: Dict[str, Any],
+        metadata: Dict[str, Any]
+    ) -> Tuple[str, str]:
+        """
+        Resolve the note timestamp and filename.
+
+        Args:
+            analysis: AI analysis results
+            metadata: Additional metadata
+
+        Returns:
+            Tuple of (creation timestamp as YYYY-MM-DDTHH:MM:SS, filename)
+        """
+        timestamp = metadata.get('timestamp') or datetime.now()
+
+        # Format the timestamp once; other formats are sliced from it
+        created = timestamp.strftime('%Y-%m-%dT%H:%M:%S')
+
+        filename = self._generate_filename(
+            title=analysis.get('title', 'Untitled'),
+            created=created
+        )
+        return created, filename
 
-    def _generate_filename(self, title: str, timestamp: datetime) -> str:
+    def _write_note(
+        self,
+        fp: TextIO,
+        analysis: Dict[str, Any],
+        content: str,
+        metadata: Dict[str, Any],
+        created: str
+    ) -> None:
+        """Write frontmatter and body to fp."""
+        self._write_frontmatter(fp, analysis, metadata, created)
+        fp.write('\n')
+        self._write_note_body(fp, analysis, content, metadata, created)
+
+    def _generate_filename(self, title: str, created: str) -> str:
         """
         Generate filename based on configured strategy.
 
         Args:
             title: Note title
-            timestamp: Creation timestamp
+            created: Creation timestamp as YYYY-MM-DDTHH:MM:SS
 
         Returns:
             Filename (without .md extension)
         """
-        date_str = timestamp.strftime('%Y-%m-%d')
-        time_str = timestamp.strftime('%H%M%S')
+        date_str = created[:10]
+        time_str = created[11:].replace(':', '')
 
         # Sanitize title for filename
         safe_title = self._sanitize_for_filename(title)
@@ -104,9 +178,8 @@ class NoteCreator:
         text = text.lower()
 
         # Replace spaces and special chars with hyphens
-        text = re.sub(r'[^\w\s-]', '', text)
-        text = re.sub(r'[\s_]+', '-', text)
-        text = re.sub(r'-+', '-', text)
+        text = _UNSAFE_CHARS_RE.sub('', text)
+        text = _SEPARATORS_RE.sub('-', text)
 
         # Remove leading/trailing hyphens
         text = text.strip('-')
@@ -118,188 +191,232 @@ class NoteCreator:
 
         return text or 'untitled'
 
-    def _build_frontmatter(
+    def _write_frontmatter(
         self,
+        buf: TextIO,
         analysis: Dict[str, Any],
-        metadata: Dict[str, Any]
-    ) -> str:
+        metadata: Dict[str, Any],
+        created: str
+    ) -> None:
         """
-        Build YAML frontmatter for the note.
+        Write YAML frontmatter for the note.
 
         Args:
+            buf: Text stream to write to
             analysis: AI analysis results
             metadata: Additional metadata
-
-        Returns:
-            Formatted frontmatter string
+            created: Creation timestamp as YYYY-MM-DDTHH:MM:SS
         """
-        timestamp = metadata.get('timestamp', datetime.now())
-        source = metadata.get('source', 'telegram')
-        source_type = metadata.get('source_type', 'text')
-
-        lines = ['---']
-
         # Basic metadata
-        lines.append(f"created: {timestamp.strftime('%Y-%m-%dT%H:%M:%S')}")
-        lines.append(f"source: {source}")
-        lines.append(f"source_type: {source_type}")
+        buf.write(_FRONTMATTER_HEADER.format(
+            created=created,
+            source=metadata.get('source', 'telegram'),
+            source_type=metadata.get('source_type', 'text'),
+        ))
+
+        get = metadata.get
 
         # Add user info if available
-        if metadata.get('user_id'):
-            lines.append(f"telegram_user_id: {metadata['user_id']}")
-        if metadata.get('username'):
-            lines.append(f"telegram_username: {metadata['username']}")
+        user_id = get('user_id')
+        if user_id:
+            buf.write(f"telegram_user_id: {user_id}\n")
+        username = get('username')
+        if username:
+            buf.write(f"telegram_username: {username}\n")
 
         # Tags
         tags = analysis.get('tags', [])
         if tags:
             if self.tag_format == 'yaml':
-                lines.append('tags:')
+                buf.write('tags:\n')
                 for tag in tags:
-                    lines.append(f"  - {tag}")
+                    buf.write(f"  - {tag}\n")
             # If inline, tags will be added in the body instead
 
         # Suggested folder
         suggested_folder = analysis.get('suggested_folder')
         if suggested_folder:
-            lines.append(f"suggested_folder: {suggested_folder}")
+            buf.write(f"suggested_folder: {suggested_folder}\n")
 
         # AI metadata
         if analysis.get('analysis_successful'):
-            lines.append(f"ai_analyzed: true")
-            lines.append(f"ai_provider: {analysis.get('ai_provider', 'unknown')}")
+            buf.write("ai_analyzed: true\n")
+            buf.write(f"ai_provider: {analysis.get('ai_provider', 'unknown')}\n")
 
         # Additional metadata
-        if metadata.get('has_media'):
-            lines.append(f"has_media: true")
-        if metadata.get('media_type'):
-            lines.append(f"media_type: {metadata['media_type']}")
-        if metadata.get('has_ocr'):
-            lines.append(f"has_ocr: true")
-        if metadata.get('article_url'):
-            lines.append(f"article_url: {metadata['article_url']}")
-
-        lines.append('---')
-
-        return '\n'.join(lines)
-
-    def _build_note_body(
+        if get('has_media'):
+            buf.write("has_media: true\n")
+        media_type = get('media_type')
+        if media_type:
+            buf.write(f"media_type: {media_type}\n")
+        if get('has_ocr'):
+            buf.write("has_ocr: true\n")
+        article_url = get('article_url')
+        if article_url:
+            buf.write(f"article_url: {article_url}\n")
+
+        buf.write('---')
+
+    def _write_note_body(
         self,
+        buf: TextIO,
         analysis: Dict[str, Any],
         content: str,
-        metadata: Dict[str, Any]
-    ) -> str:
+        metadata: Dict[str, Any],
+        created: str
+    ) -> None:
         """
-        Build the main body of the note.
+        Write the main body of the note.
 
         Args:
+            buf: Text stream to write to
             analysis: AI analysis results
             content: Original content
             metadata: Additional metadata
-
-        Returns:
-            Formatted note body
+            created: Creation timestamp as YYYY-MM-DDTHH:MM:SS
         """
-        lines = []
-
         # Title
         title = analysis.get('title', 'Untitled Note')
-        lines.append(f"\n# {title}\n")
+        buf.write(f"\n# {title}\n\n")
 
         # If using inline tags, add them here
-        if self.tag_format == 'inline' and analysis.get('tags'):
-            tag_str = ' '.join([f"#{tag}" for tag in analysis['tags']])
-            lines.append(f"{tag_str}\n")
+        if self.tag_format == 'inline':
+            tags = analysis.get('tags')
+            if tags:
+                tag_str = ' '.join([f"#{tag}" for tag in tags])
+                buf.write(f"{tag_str}\n\n")
 
         # Main content
-        lines.append(content)
-        lines.append("")
+        buf.write(content)
+        buf.write("\n\n")
+
+        get = metadata.get
+        source_type = get('source_type')
 
         # Media attachments
-        if metadata.get('media_attachments'):
-            lines.append("## Attachments\n")
-            for attachment in metadata['media_attachments']:
+        media_attachments = get('media_attachments')
+        if media_attachments:
+            buf.write("## Attachments\n\n")
+            for attachment in media_attachments:
                 # Obsidian embed syntax
-                lines.append(f"![[{attachment}]]\n")
+                buf.write(f"![[{attachment}]]\n\n")
 
         # OCR text (if different from main content)
-        if metadata.get('ocr_text') and metadata.get('source_type') in ['photo', 'document']:
-            lines.append("## Extracted Text (OCR)\n")
-            lines.append(metadata['ocr_text'])
-            lines.append("")
+        ocr_text = get('ocr_text')
+        if ocr_text and source_type in ('photo', 'document'):
+            buf.write("## Extracted Text (OCR)\n\n")
+            buf.write(ocr_text)
+            buf.write("\n\n")
 
         # AI Analysis section
         if analysis.get('analysis_successful'):
-            lines.append("---\n")
-            lines.append("## AI Analysis\n")
+            buf.write("---\n\n")
+            buf.write("## AI Analysis\n\n")
 
             summary = analysis.get('summary')
             if summary:
-                lines.append(f"**Summary**: {summary}\n")
+                buf.write(f"**Summary**: {summary}\n\n")
 
             entities = analysis.get('entities')
             if entities:
                 entities_str = ', '.join(entities)
-                lines.append(f"**Key Entities**: {entities_str}\n")
+                buf.write(f"**Key Entities**: {entities_str}\n\n")
 
             connections = analysis.get('connections')
             if connections:
-                lines.append("**Suggested Connections**:")
+                buf.write("**Suggested Connections**:\n")
                 for connection in connections:
-                    lines.append(f"- {connection}")
-                lines.append("")
+                    buf.write(f"- {connection}\n")
+                buf.write("\n")
 
         # Footer with metadata
-        lines.append("---\n")
-        timestamp = metadata.get('timestamp', datetime.now())
-        lines.append(f"**Source**: {metadata.get('source', 'Telegram')}")
-        if metadata.get('source_type'):
-            lines.append(f" ({metadata['source_type']})")
-        lines.append(f"\n**Received**: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
-
-        return '\n'.join(lines)
+        buf.write("---\n\n")
+        buf.write(f"**Source**: {get('source', 'Telegram')}\n")
+        if source_type:
+            buf.write(f" ({source_type})\n")
+        buf.write(f"\n**Received**: {created[:10]} {created[11:]}")
 
     def create_preview(
         self,
         analysis: Dict[str, Any],
         metadata: Dict[str, Any]
-    ) -> str:
+    ) -> Tuple[str, List[Tuple[str, int, int]]]:
         """
         Create a preview message to send back to Telegram.
 
+        Formatting is returned as Telegram entity spans rather than
+        Markdown markers, so titles and tags containing '*' or '_' are
+        sent verbatim and Telegram does not have to parse the text.
+
         Args:
             analysis: AI analysis results
             metadata: Additional metadata
 
         Returns:
-            Formatted preview text
+            Tuple of (plain preview text, list of (entity_type, offset,
+            length) spans with offsets in UTF-16 code units)
         """
-        lines = []
-
-        lines.append("✓ *Saved to Obsidian*\n")
+        parts = []
+        spans = []
+        offset = 0
+
+        def add(text: str, style: Optional[str] = None) -> None:
+            nonlocal offset
+            length = _utf16_len(text)
+            if style:
+                spans.append((style, offset, length))
+            parts.append(text)
+            offset += length
+
+        add("✓ ")
+        add("Saved to Obsidian", 'bold')
+        add("\n\n")
 
         title = analysis.get('title', 'Untitled')
-        lines.append(f"*Title*: {title}")
+        add("Title", 'bold')
+        add(f": {title}")
 
         folder = analysis.get('suggested_folder')
         if folder:
-            lines.append(f"*Folder*: {folder}")
+            add("\n")
+            add("Folder", 'bold')
+            add(f": {folder}")
 
         tags = analysis.get('tags', [])
         if tags:
             tags_str = ', '.join([f"#{tag}" for tag in tags])
-            lines.append(f"*Tags*: {tags_str}")
+            add("\n")
+            add("Tags", 'bold')
+            add(f": {tags_str}")
 
         summary = analysis.get('summary')
         if summary:
-            lines.append(f"\n*Summary*: {summary}")
+            add("\n\n")
+            add("Summary", 'bold')
+            add(f": {summary}")
 
         connections = analysis.get('connections')
         if connections and len(connections) > 0:
-            lines.append(f"\n*Related to*: {connections[0]}")
+            add("\n\n")
+            add("Related to", 'bold')
+            add(f": {connections[0]}")
 
         # AI provider info
         if not analysis.get('analysis_successful'):
-            lines.append("\n_Note: AI analysis was unavailable_")
+            add("\n\n")
+            add("Note: AI analysis was unavailable", 'italic')
+
+        # OCR info
+        ocr_text = metadata.get('ocr_text')
+        if metadata.get('has_ocr') and ocr_text:
+            add("\n\n")
+            add(f"OCR: {len(ocr_text)} characters extracted", 'italic')
+
+        return ''.join(parts), spans
+
 
-        return '\n'.join(lines)
+def _utf16_len(text: str) -> int:
+    """Length of text in UTF-16 code units, as Telegram counts offsets."""
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-16-le')) // 2
@@ -1,24 +1,76 @@
 """Find and search existing notes in Obsidian vault."""
 
+import asyncio
+import heapq
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import re
 
+import yaml
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+from src.obsidian.note_index import NoteIndex, index_path, words
+from src.obsidian.vault_scan import iter_markdown
+
 logger = logging.getLogger('obsidian_telegram_bot')
 
+_H1_RE = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+_TITLE_RE = re.compile(r'^title:\s*(.+)$', re.MULTILINE | re.IGNORECASE)
+_INLINE_TAG_RE = re.compile(r'#([\w-]+)')
+_FRONTMATTER_RE = re.compile(r'\A---\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)', re.DOTALL)
+_TAG_SEPARATORS_RE = re.compile(r'[\s,]+')
+# "tags:" followed by "  - tag" lines, for frontmatter that is not valid YAML
+_TAG_LIST_RE = re.compile(r'^tags:[ \t]*\r?\n((?:[ \t]+-.*(?:\r?\n|\Z))+)', re.MULTILINE)
+_TAG_ITEM_RE = re.compile(r'^[ \t]+-[ \t]*(.*?)[ \t]*\r?$', re.MULTILINE)
+
+# Below this many search terms, a C-level str scan per term beats
+# building an automaton and walking its matches in Python
+_AUTOMATON_MIN_TERMS = 8
+
+# libyaml's C loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 class NoteFinder:
     """Search and find related notes in the vault."""
 
-    def __init__(self, vault_path: str):
+    def __init__(self, vault_path: str, index_dir: Optional[str] = None):
         """
         Initialize note finder.
 
         Args:
             vault_path: Path to Obsidian vault
+            index_dir: Folder for the persistent note index (keep it
+                outside the vault), or None to index in memory only
         """
         self.vault_path = Path(vault_path)
+        self._index_path = index_path(index_dir, self.vault_path) if index_dir else None
+        # Opened and filled by the first query
+        self._index: Optional[NoteIndex] = None
+        self._refresh_lock = threading.Lock()
+
+        # Reading notes is I/O-bound, so a few threads overlap the waits
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='note-reader')
+
+    def close(self) -> None:
+        """Stop the reader threads and close the note index."""
+        self._executor.shutdown(wait=True)
+        if self._index is not None:
+            self._index.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
     async def find_related_notes(
         self,
@@ -41,88 +93,262 @@ class NoteFinder:
             return []
 
         try:
-            logger.debug(f"Searching for related notes - Tags: {tags}, Entities: {entities}")
+            logger.debug("Searching for related notes - Tags: %s, Entities: %s", tags, entities)
 
-            related_notes = []
+            # Index refresh and scoring block on disk and SQLite
+            results = await asyncio.to_thread(
+                self._find_related_notes, tags, entities or [], max_results
+            )
 
-            # Scan all markdown files
-            for note_path in self.vault_path.rglob('*.md'):
-                # Skip hidden files
-                if any(part.startswith('.') for part in note_path.parts):
-                    continue
+            logger.debug("Found %d related notes", len(results))
+            return results
 
-                # Read note content
-                try:
-                    content = note_path.read_text(encoding='utf-8')
-                except Exception as e:
-                    logger.warning(f"Could not read {note_path}: {e}")
-                    continue
+        except Exception as e:
+            logger.error(f"Error finding related notes: {e}")
+            return []
+
+    def _find_related_notes(
+        self,
+        tags: List[str],
+        entities: List[str],
+        max_results: int
+    ) -> List[Dict[str, Any]]:
+        """Blocking body of find_related_notes."""
+        if max_results <= 0:
+            return []
+
+        # Min-heap of the best max_results notes as (score, -order, info);
+        # on equal scores the later note is the one evicted
+        best: List[Tuple[float, int, Dict[str, Any]]] = []
+
+        # Bring the index up to date, then read and score only notes
+        # containing every word of at least one tag or entity
+        index = self._refresh_index()
+        groups = [words(tag) for tag in tags] + [words(entity) for entity in entities]
+        candidates = index.candidates(groups)
+
+        # Lowercase the search patterns once, not once per note
+        tag_patterns = [(f"#{tag.lower()}", f"- {tag.lower()}") for tag in tags]
+        entity_patterns = [entity.lower() for entity in entities]
+
+        terms = [pattern for pair in tag_patterns for pattern in pair]
+        terms.extend(entity_patterns)
+
+        # With many terms one automaton sweep beats a scan per term
+        automaton = _build_automaton(terms)
+
+        texts = self._executor.map(self._read_text, [path for path, _, _ in candidates])
 
-                # Calculate relevance score
+        for order, ((path, title, note_tags), text) in enumerate(zip(candidates, texts)):
+            if text is None:
+                continue
+
+            # Once the heap is full a note has to beat its weakest entry
+            threshold = best[0][0] if len(best) >= max_results else 0.0
+
+            # Calculate relevance score
+            if automaton is not None:
+                score = self._score_with_automaton(
+                    automaton, text, tag_patterns, entity_patterns
+                )
+            else:
                 score = self._calculate_relevance_score(
-                    content=content,
-                    tags=tags,
-                    entities=entities or []
+                    content_lower=text,
+                    tag_patterns=tag_patterns,
+                    entity_patterns=entity_patterns,
+                    threshold=threshold
                 )
 
-                if score > 0:
-                    # Extract note info
-                    note_info = {
-                        'title': self._extract_title(content, note_path),
-                        'path': str(note_path.relative_to(self.vault_path)),
-                        'tags': self._extract_tags(content),
-                        'score': score
-                    }
-                    related_notes.append(note_info)
-
-            # Sort by score (highest first) and limit results
-            related_notes.sort(key=lambda x: x['score'], reverse=True)
-            results = related_notes[:max_results]
-
-            logger.debug(f"Found {len(results)} related notes")
-            return results
+            if score > threshold:
+                note_info = {
+                    'title': title,
+                    'path': path,
+                    'tags': note_tags,
+                    'score': score
+                }
+                if len(best) < max_results:
+                    heapq.heappush(best, (score, -order, note_info))
+                else:
+                    heapq.heapreplace(best, (score, -order, note_info))
+
+        # Sort by score (highest first)
+        best.sort(key=lambda item: (-item[0], -item[1]))
+        return [note_info for _, _, note_info in best]
+
+    def _refresh_index(self) -> NoteIndex:
+        """
+        Re-index notes added, changed or removed since the last refresh.
+
+        Only files whose mtime or size differ from the index are read,
+        spread over a small thread pool. The first call opens the index.
+
+        Returns:
+            The up-to-date index
+        """
+        with self._refresh_lock:
+            if self._index is None:
+                self._index = NoteIndex(self._index_path)
+
+            known = self._index.file_states()
+            stale = []
+
+            for relative, entry in iter_markdown(self.vault_path):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                state = (stat.st_mtime_ns, stat.st_size)
+                if known.pop(relative, None) != state:
+                    stale.append((relative, entry.path, state))
+
+            changed = [
+                note for note in self._executor.map(self._read_note, stale)
+                if note is not None
+            ]
+
+            # Whatever is left in known was deleted
+            if changed or known:
+                self._index.update(changed, removed=known)
+                logger.debug("Note index updated - %d changed, %d removed", len(changed), len(known))
+
+            return self._index
+
+    def _read_note(
+        self,
+        item: Tuple[str, str, Tuple[int, int]]
+    ) -> Optional[Tuple[str, int, int, str, List[str], List[str]]]:
+        """
+        Read and parse one note for the index.
+
+        Args:
+            item: (relative path, absolute path, (mtime_ns, size))
+
+        Returns:
+            Index row for NoteIndex.update, or None if unreadable
+        """
+        relative, path, (mtime_ns, size) = item
+        note_path = Path(path)
 
+        try:
+            content = note_path.read_text(encoding='utf-8')
         except Exception as e:
-            logger.error(f"Error finding related notes: {e}")
-            return []
+            logger.warning(f"Could not read {note_path}: {e}")
+            return None
+
+        return (
+            relative,
+            mtime_ns,
+            size,
+            self._extract_title(content, note_path),
+            self._extract_tags(content),
+            words(content)
+        )
+
+    def _read_text(self, relative: str) -> Optional[str]:
+        """
+        Read a note's lowercased text for scoring.
+
+        Args:
+            relative: Path relative to the vault
+
+        Returns:
+            Lowercased note content, or None if unreadable
+        """
+        try:
+            return (self.vault_path / relative).read_text(encoding='utf-8').lower()
+        except Exception as e:
+            logger.warning(f"Could not read {relative}: {e}")
+            return None
 
     def _calculate_relevance_score(
         self,
-        content: str,
-        tags: List[str],
-        entities: List[str]
+        content_lower: str,
+        tag_patterns: List[Tuple[str, str]],
+        entity_patterns: List[str],
+        threshold: float = 0.0
     ) -> float:
         """
         Calculate relevance score for a note.
 
+        Stops early once the note can no longer score above threshold;
+        the partial score returned then is at most threshold.
+
         Args:
-            content: Note content
-            tags: Tags to match
-            entities: Entities to match
+            content_lower: Note content, already lowercased
+            tag_patterns: ("#tag", "- tag") pair per tag, lowercased
+            entity_patterns: Lowercased entities
+            threshold: Score the note has to exceed to be of interest
 
         Returns:
             Relevance score (higher is more relevant)
         """
         score = 0.0
-        content_lower = content.lower()
 
-        # Score for matching tags (case-insensitive)
-        for tag in tags:
-            tag_lower = tag.lower()
+        # Each tag is worth up to 2.0, each entity up to 2.0
+        remaining = 2.0 * (len(tag_patterns) + len(entity_patterns))
 
+        # Score for matching tags (case-insensitive)
+        for inline_tag, list_tag in tag_patterns:
             # Check for tag in frontmatter or inline
-            if f"#{tag_lower}" in content_lower or f"- {tag_lower}" in content_lower:
+            if inline_tag in content_lower or list_tag in content_lower:
                 score += 2.0  # High weight for tag matches
 
-        # Score for matching entities
-        for entity in entities:
-            entity_lower = entity.lower()
+            remaining -= 2.0
+            if score + remaining <= threshold:
+                return score
 
+        # Score for matching entities
+        for entity_lower in entity_patterns:
             # Count occurrences
             count = content_lower.count(entity_lower)
             if count > 0:
                 score += min(count * 0.5, 2.0)  # Cap at 2.0 per entity
 
+            remaining -= 2.0
+            if score + remaining <= threshold:
+                return score
+
+        return score
+
+    def _score_with_automaton(
+        self,
+        automaton: "ahocorasick.Automaton",
+        content_lower: str,
+        tag_patterns: List[Tuple[str, str]],
+        entity_patterns: List[str]
+    ) -> float:
+        """
+        Same score as _calculate_relevance_score, from one pass over the text.
+
+        Args:
+            automaton: Automaton built by _build_automaton over the terms
+            content_lower: Note content, already lowercased
+            tag_patterns: ("#tag", "- tag") pair per tag, lowercased
+            entity_patterns: Lowercased entities
+
+        Returns:
+            Relevance score (higher is more relevant)
+        """
+        counts: Dict[str, int] = {}
+        last_end: Dict[str, int] = {}
+
+        # Count non-overlapping occurrences, as str.count does
+        for end, word in automaton.iter(content_lower):
+            if end - len(word) >= last_end.get(word, -1):
+                counts[word] = counts.get(word, 0) + 1
+                last_end[word] = end
+
+        score = 0.0
+        for inline_tag, list_tag in tag_patterns:
+            if inline_tag in counts or list_tag in counts:
+                score += 2.0  # High weight for tag matches
+
+        for entity_lower in entity_patterns:
+            count = counts.get(entity_lower, 0)
+            if count > 0:
+                score += min(count * 0.5, 2.0)  # Cap at 2.0 per entity
+
         return score
 
     def _extract_title(self, content: str, file_path: Path) -> str:
@@ -137,12 +363,12 @@ class NoteFinder:
             Note title
         """
         # Try to find H1 heading
-        match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+        match = _H1_RE.search(content)
         if match:
             return match.group(1).strip()
 
         # Try frontmatter title
-        match = re.search(r'^title:\s*(.+)$', content, re.MULTILINE | re.IGNORECASE)
+        match = _TITLE_RE.search(content)
         if match:
             return match.group(1).strip().strip('"\'')
 
@@ -162,31 +388,12 @@ class NoteFinder:
         tags = set()
 
         # Extract from frontmatter
-        in_frontmatter = False
-        in_tags_section = False
-
-        for line in content.split('\n'):
-            if line.strip() == '---':
-                if not in_frontmatter:
-                    in_frontmatter = True
-                else:
-                    in_frontmatter = False
-                    in_tags_section = False
-                continue
-
-            if in_frontmatter:
-                if line.strip().startswith('tags:'):
-                    in_tags_section = True
-                    continue
-                elif in_tags_section and line.startswith('  - '):
-                    tag = line.strip('  - ').strip()
-                    tags.add(tag)
-                elif in_tags_section and not line.startswith('  '):
-                    in_tags_section = False
+        match = _FRONTMATTER_RE.match(content)
+        if match:
+            tags.update(_frontmatter_tags(match.group(1)))
 
         # Extract inline tags (#tag)
-        inline_tags = re.findall(r'#([\w-]+)', content)
-        tags.update(inline_tags)
+        tags.update(_INLINE_TAG_RE.findall(content))
 
         return list(tags)
 
@@ -209,33 +416,88 @@ class NoteFinder:
             return []
 
         try:
-            query_lower = query.lower()
-            matches = []
+            matches = await asyncio.to_thread(self._search_content, query, max_results)
 
-            for note_path in self.vault_path.rglob('*.md'):
-                if any(part.startswith('.') for part in note_path.parts):
-                    continue
-
-                try:
-                    content = note_path.read_text(encoding='utf-8')
-                    content_lower = content.lower()
-
-                    if query_lower in content_lower:
-                        matches.append({
-                            'title': self._extract_title(content, note_path),
-                            'path': str(note_path.relative_to(self.vault_path))
-                        })
-
-                        if len(matches) >= max_results:
-                            break
-
-                except Exception as e:
-                    logger.warning(f"Could not read {note_path}: {e}")
-                    continue
-
-            logger.debug(f"Found {len(matches)} notes matching '{query}'")
+            logger.debug("Found %d notes matching '%s'", len(matches), query)
             return matches
 
         except Exception as e:
             logger.error(f"Error searching content: {e}")
             return []
+
+    def _search_content(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Blocking body of search_content."""
+        # Only notes holding every word of the query are read
+        query = query.lower()
+        candidates = self._refresh_index().candidates([words(query)])
+        texts = self._executor.map(self._read_text, [path for path, _, _ in candidates])
+
+        matches = []
+        for (path, title, _), text in zip(candidates, texts):
+            if text is not None and query in text:
+                matches.append({'title': title, 'path': path})
+                if len(matches) >= max_results:
+                    break
+        return matches
+
+
+def _frontmatter_tags(frontmatter: str) -> List[str]:
+    """
+    Read the tags list from a note's YAML frontmatter.
+
+    Accepts both a YAML list and a comma/space separated string, with or
+    without leading '#'.
+
+    Args:
+        frontmatter: Text between the '---' lines
+
+    Returns:
+        Tags listed in the frontmatter (empty if none or unparsable)
+    """
+    try:
+        data = yaml.load(frontmatter, Loader=_YAML_LOADER)
+    except yaml.YAMLError:
+        # Notes often carry unquoted values YAML rejects (e.g. a title
+        # with ': '); still pick up a plain tag list
+        match = _TAG_LIST_RE.search(frontmatter)
+        data = {'tags': _TAG_ITEM_RE.findall(match.group(1)) if match else None}
+
+    if not isinstance(data, dict):
+        return []
+
+    value = data.get('tags')
+    if isinstance(value, str):
+        value = _TAG_SEPARATORS_RE.split(value)
+    elif not isinstance(value, list):
+        return []
+
+    tags = []
+    for tag in value:
+        if tag is None or isinstance(tag, (dict, list)):
+            continue
+        tag = str(tag).strip().lstrip('#')
+        if tag:
+            tags.append(tag)
+    return tags
+
+
+def _build_automaton(terms: List[str]) -> Optional["ahocorasick.Automaton"]:
+    """
+    Build an Aho-Corasick automaton over the search terms.
+
+    Args:
+        terms: Lowercase search terms
+
+    Returns:
+        Automaton yielding each matched term, or None when pyahocorasick
+        is not installed, there are too few terms to pay off, or a term
+        is empty
+    """
+    if not AHOCORASICK_AVAILABLE or len(terms) < _AUTOMATON_MIN_TERMS or '' in terms:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        automaton.add_word(term, term)
+    automaton.make_automaton()
+    return automaton
@@ -0,0 +1,196 @@
+"""Persistent on-disk index of vault notes."""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils import json_utils
+
+logger = logging.getLogger('obsidian_telegram_bot')
+
+_WORD_RE = re.compile(r'\w+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    tags BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS note_terms (
+    term TEXT NOT NULL,
+    note_id INTEGER NOT NULL,
+    PRIMARY KEY (term, note_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS note_terms_note ON note_terms (note_id);
+"""
+
+
+def index_path(index_dir: str, vault_path: Path) -> Path:
+    """
+    Work out the index file for a vault.
+
+    Each vault gets its own file, named after a hash of its resolved
+    path, so pointing the bot at another vault never mixes their notes.
+
+    Args:
+        index_dir: Folder holding index files
+        vault_path: Vault root
+
+    Returns:
+        Path of the SQLite file
+    """
+    vault_id = hashlib.blake2b(
+        str(vault_path.resolve()).encode('utf-8', 'surrogatepass'), digest_size=8
+    ).hexdigest()
+    return Path(index_dir).expanduser() / f"notes-{vault_id}.sqlite"
+
+
+def words(text: str) -> List[str]:
+    """
+    Split text into the distinct lowercase words the index stores.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Distinct words, in order of first appearance
+    """
+    return list(dict.fromkeys(_WORD_RE.findall(text.lower())))
+
+
+class NoteIndex:
+    """
+    SQLite store of note titles, tags and the words each note contains.
+
+    Rows are keyed by vault-relative path and carry the file's mtime and
+    size, so a rescan only has to re-read files that changed. Each note's
+    distinct words go into an inverted table (word -> notes), which lets
+    queries pick candidate notes without opening any files. Note text
+    itself is not stored.
+
+    Safe to share between threads; all access goes through one lock.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Open (or create) the index.
+
+        Args:
+            db_path: SQLite file, or None for an in-memory index
+        """
+        self._lock = threading.Lock()
+        self._conn = self._connect(db_path)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _connect(db_path: Optional[Path]) -> sqlite3.Connection:
+        """Open the database, falling back to memory if the file is unusable."""
+        if db_path is not None:
+            try:
+                db_path.parent.mkdir(parents=True, exist_ok=True)
+                return sqlite3.connect(str(db_path), check_same_thread=False)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Could not open note index at %s, using memory: %s", db_path, e)
+
+        return sqlite3.connect(':memory:', check_same_thread=False)
+
+    def file_states(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Get the recorded state of every indexed note.
+
+        Returns:
+            Mapping of relative path to (mtime_ns, size)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT path, mtime_ns, size FROM notes").fetchall()
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def update(
+        self,
+        changed: Iterable[Tuple[str, int, int, str, List[str], List[str]]],
+        removed: Iterable[str] = ()
+    ) -> None:
+        """
+        Apply a batch of changes in one transaction.
+
+        Args:
+            changed: (path, mtime_ns, size, title, tags, words) per new or
+                modified note, words as returned by words()
+            removed: Paths of notes that no longer exist
+        """
+        with self._lock, self._conn:
+            for path in removed:
+                self._delete(path)
+
+            for path, mtime_ns, size, title, tags, note_words in changed:
+                self._delete(path)
+                cursor = self._conn.execute(
+                    "INSERT INTO notes (path, mtime_ns, size, title, tags) VALUES (?, ?, ?, ?, ?)",
+                    (path, mtime_ns, size, title, json_utils.dumps_bytes(tags))
+                )
+                note_id = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO note_terms (term, note_id) VALUES (?, ?)",
+                    ((word, note_id) for word in note_words)
+                )
+
+    def _delete(self, path: str) -> None:
+        """Remove one note's rows (caller holds the lock)."""
+        row = self._conn.execute("SELECT id FROM notes WHERE path = ?", (path,)).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM note_terms WHERE note_id = ?", row)
+            self._conn.execute("DELETE FROM notes WHERE id = ?", row)
+
+    def candidates(self, groups: List[List[str]]) -> List[Tuple[str, str, List[str]]]:
+        """
+        Find notes containing all words of at least one group.
+
+        Args:
+            groups: Word lists from words(); an empty list matches every note
+
+        Returns:
+            List of (path, title, tags) per matching note, in index order
+        """
+        selects = []
+        params: List = []
+
+        for group in groups:
+            group = list(dict.fromkeys(group))
+            if not group:
+                selects = ["SELECT id FROM notes"]
+                params = []
+                break
+
+            selects.append(
+                "SELECT note_id FROM note_terms WHERE term IN ({}) "
+                "GROUP BY note_id HAVING COUNT(*) = ?".format(', '.join('?' * len(group)))
+            )
+            params.extend(group)
+            params.append(len(group))
+
+        if not selects:
+            return []
+
+        sql = (
+            "SELECT path, title, tags FROM notes WHERE id IN ("
+            + ' UNION '.join(selects)
+            + ") ORDER BY id"
+        )
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [(path, title, json_utils.loads(tags)) for path, title, tags in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
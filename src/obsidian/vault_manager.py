@@ -1,8 +1,15 @@
 """Obsidian vault file operations manager."""
 
+import asyncio
 import logging
+import os
+import shutil
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import BinaryIO, Dict, Any, Optional, List, Iterator, Set, TextIO, Tuple
+
+from src.utils.cache import LRUCache
+from src.obsidian.vault_scan import list_folders
 
 logger = logging.getLogger('obsidian_telegram_bot')
 
@@ -31,11 +38,25 @@ class VaultManager:
         self.incoming_folder = obsidian_config.get('incoming_folder', 'Incoming')
         self.media_folder = config.get('media', {}).get('media_folder', '_attachments')
 
+        # Folder scans are shared by every message arriving within the TTL
+        folder_cache_ttl = float(obsidian_config.get('folder_cache_ttl', 30))
+        self._folder_cache = LRUCache(
+            maxsize=4 if folder_cache_ttl > 0 else 0,
+            ttl=folder_cache_ttl
+        )
+
+        # Folders already created this run, so repeat saves skip mkdir
+        self._known_dirs: Set[Path] = set()
+
+        # Bumped whenever this manager creates a folder, which makes any
+        # cached folder listing stale
+        self._folders_version = 0
+
         # Validate vault path
         if not self.vault_path.exists():
             raise VaultError(f"Vault path does not exist: {self.vault_path}")
 
-        logger.info(f"Initialized vault manager - Vault: {self.vault_path}")
+        logger.info("Initialized vault manager - Vault: %s", self.vault_path)
 
     async def save_note(
         self,
@@ -58,33 +79,136 @@ class VaultManager:
             VaultError: If save operation fails
         """
         try:
-            # Ensure filename has .md extension
-            if not filename.endswith('.md'):
-                filename = f"{filename}.md"
+            # Disk writes block, and vaults often live on slow or synced drives
+            note_path = await asyncio.to_thread(
+                self._sync_save_note, note_content, filename, subfolder
+            )
 
-            # Determine target folder
-            if subfolder:
-                target_folder = self.vault_path / self.incoming_folder / subfolder
-            else:
-                target_folder = self.vault_path / self.incoming_folder
+            logger.info("Note saved: %s", note_path.relative_to(self.vault_path))
+            return note_path
 
-            # Create folder if it doesn't exist
-            target_folder.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            logger.error("Failed to save note: %s", e)
+            raise VaultError(f"Could not save note: {e}")
 
-            # Handle filename conflicts
-            note_path = target_folder / filename
-            note_path = self._resolve_filename_conflict(note_path)
+    def _sync_save_note(
+        self,
+        note_content: str,
+        filename: str,
+        subfolder: Optional[str]
+    ) -> Path:
+        """
+        Write a note to the vault (blocking).
+
+        Args:
+            note_content: Markdown content of the note
+            filename: Filename (with or without .md extension)
+            subfolder: Optional subfolder within incoming folder
+
+        Returns:
+            Path to the saved note
+        """
+        note_path, fp = self._create_note_file(filename, subfolder)
+        with fp:
+            fp.write(note_content)
+        return note_path
 
-            # Write the note
-            note_path.write_text(note_content, encoding='utf-8')
+    def _create_note_file(self, filename: str, subfolder: Optional[str]) -> Tuple[Path, TextIO]:
+        """
+        Create and open a new, uniquely named note file (blocking).
 
-            logger.info(f"Note saved: {note_path.relative_to(self.vault_path)}")
-            return note_path
+        Args:
+            filename: Filename (with or without .md extension)
+            subfolder: Optional subfolder within incoming folder
+
+        Returns:
+            Tuple of (note path, text file open for writing)
+        """
+        folder_recreated = False
+
+        while True:
+            note_path = self._prepare_note_path(filename, subfolder)
+
+            try:
+                # Exclusive create: saves run in parallel threads, so
+                # another one may have claimed the same name meanwhile
+                return note_path, note_path.open('x', encoding='utf-8')
+            except FileExistsError:
+                continue
+            except FileNotFoundError:
+                # Folder was removed behind our back; forget it so it is
+                # created again, and retry once
+                self._known_dirs.discard(note_path.parent)
+                if folder_recreated:
+                    raise
+                folder_recreated = True
+
+    @contextmanager
+    def open_note(
+        self,
+        filename: str,
+        subfolder: Optional[str] = None
+    ) -> Iterator[TextIO]:
+        """
+        Open a new note in the vault for writing (blocking).
+
+        Lets callers write a note in pieces instead of passing the whole
+        text to save_note. If writing fails the partial file is removed.
+
+        Args:
+            filename: Filename (with or without .md extension)
+            subfolder: Optional subfolder within incoming folder
+
+        Yields:
+            Text file open for writing
+
+        Raises:
+            VaultError: If the note cannot be created or written
+        """
+        try:
+            note_path, fp = self._create_note_file(filename, subfolder)
+        except Exception as e:
+            logger.error("Failed to save note: %s", e)
+            raise VaultError(f"Could not save note: {e}")
 
+        try:
+            with fp:
+                yield fp
         except Exception as e:
-            logger.error(f"Failed to save note: {e}")
+            note_path.unlink(missing_ok=True)
+            logger.error("Failed to save note: %s", e)
             raise VaultError(f"Could not save note: {e}")
 
+        logger.info("Note saved: %s", note_path.relative_to(self.vault_path))
+
+    def _prepare_note_path(self, filename: str, subfolder: Optional[str]) -> Path:
+        """
+        Work out where a new note goes, creating its folder if needed.
+
+        Args:
+            filename: Filename (with or without .md extension)
+            subfolder: Optional subfolder within incoming folder
+
+        Returns:
+            Free path for the note
+        """
+        # Ensure filename has .md extension
+        if not filename.endswith('.md'):
+            filename = f"{filename}.md"
+
+        # Determine target folder
+        if subfolder:
+            target_folder = self.vault_path / self.incoming_folder / subfolder
+        else:
+            target_folder = self.vault_path / self.incoming_folder
+
+        # Create folder if it doesn't exist
+        self._ensure_dir(target_folder)
+
+        # Handle filename conflicts
+        note_path = target_folder / filename
+        return self._resolve_filename_conflict(note_path)
+
     async def save_attachment(
         self,
         file_data: bytes,
@@ -104,59 +228,170 @@ class VaultManager:
             VaultError: If save operation fails
         """
         try:
-            # Create attachments folder
-            attachments_folder = self.vault_path / self.media_folder
-            attachments_folder.mkdir(parents=True, exist_ok=True)
+            file_path = await asyncio.to_thread(
+                self._sync_save_attachment, file_data, filename
+            )
 
-            # Handle filename conflicts
-            file_path = attachments_folder / filename
-            file_path = self._resolve_filename_conflict(file_path)
+            # Return relative path for Obsidian linking
+            relative_path = file_path.relative_to(self.vault_path)
+
+            logger.info("Attachment saved: %s", relative_path)
+            return relative_path
+
+        except Exception as e:
+            logger.error("Failed to save attachment: %s", e)
+            raise VaultError(f"Could not save attachment: {e}")
+
+    async def import_attachment(
+        self,
+        source_path: Path,
+        filename: str
+    ) -> Path:
+        """
+        Copy a media file already on disk into the vault.
+
+        Like save_attachment, but the data goes file to file without
+        passing through memory.
+
+        Args:
+            source_path: File to copy (left in place)
+            filename: Filename for the attachment
 
-            # Write file
-            file_path.write_bytes(file_data)
+        Returns:
+            Path to the saved attachment (relative to vault for linking)
+
+        Raises:
+            VaultError: If save operation fails
+        """
+        try:
+            file_path = await asyncio.to_thread(
+                self._sync_import_attachment, source_path, filename
+            )
 
             # Return relative path for Obsidian linking
             relative_path = file_path.relative_to(self.vault_path)
 
-            logger.info(f"Attachment saved: {relative_path}")
+            logger.info("Attachment saved: %s", relative_path)
             return relative_path
 
         except Exception as e:
-            logger.error(f"Failed to save attachment: {e}")
+            logger.error("Failed to save attachment: %s", e)
             raise VaultError(f"Could not save attachment: {e}")
 
+    def _sync_import_attachment(self, source_path: Path, filename: str) -> Path:
+        """
+        Copy a media file into the vault (blocking).
+
+        Args:
+            source_path: File to copy
+            filename: Filename for the attachment
+
+        Returns:
+            Absolute path to the saved attachment
+        """
+        with open(source_path, 'rb') as src:
+            file_path, dst = self._create_attachment_file(filename)
+            with dst:
+                # Copies in chunks; the file is never held in memory whole
+                shutil.copyfileobj(src, dst)
+            return file_path
+
+    def _sync_save_attachment(self, file_data: bytes, filename: str) -> Path:
+        """
+        Write a media attachment to the vault (blocking).
+
+        Args:
+            file_data: Binary file data
+            filename: Filename for the attachment
+
+        Returns:
+            Absolute path to the saved attachment
+        """
+        file_path, fp = self._create_attachment_file(filename)
+        with fp:
+            fp.write(file_data)
+        return file_path
+
+    def _create_attachment_file(self, filename: str) -> Tuple[Path, BinaryIO]:
+        """
+        Create and open a new, uniquely named attachment file (blocking).
+
+        Args:
+            filename: Filename for the attachment
+
+        Returns:
+            Tuple of (attachment path, binary file open for writing)
+        """
+        attachments_folder = self.vault_path / self.media_folder
+        folder_recreated = False
+
+        while True:
+            # Create attachments folder
+            self._ensure_dir(attachments_folder)
+
+            # Handle filename conflicts
+            file_path = self._resolve_filename_conflict(attachments_folder / filename)
+
+            try:
+                return file_path, file_path.open('xb')
+            except FileExistsError:
+                continue
+            except FileNotFoundError:
+                # Folder was removed behind our back; forget it so it is
+                # created again, and retry once
+                self._known_dirs.discard(attachments_folder)
+                if folder_recreated:
+                    raise
+                folder_recreated = True
+
+    def _ensure_dir(self, folder: Path) -> None:
+        """
+        Create a folder unless this manager already did.
+
+        Args:
+            folder: Folder that must exist
+        """
+        if folder not in self._known_dirs:
+            folder.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(folder)
+            self._folders_version += 1
+
     def get_existing_folders(self, max_depth: int = 3) -> List[str]:
         """
         Scan vault for existing folders.
 
+        Results are reused for obsidian.folder_cache_ttl seconds, so a
+        burst of messages triggers a single scan. A listing is dropped
+        early when the vault root's mtime changes or this manager has
+        created a folder since it was taken.
+
         Args:
             max_depth: Maximum folder depth to scan
 
         Returns:
             List of folder paths relative to vault root
         """
-        folders = []
-
         try:
-            # Walk the vault directory
-            for item in self.vault_path.rglob('*'):
-                if item.is_dir():
-                    # Skip hidden folders and system folders
-                    if any(part.startswith('.') for part in item.parts):
-                        continue
+            stamp = (self.vault_path.stat().st_mtime_ns, self._folders_version)
+        except OSError:
+            stamp = None
 
-                    # Calculate depth
-                    relative_path = item.relative_to(self.vault_path)
-                    depth = len(relative_path.parts)
+        cached = self._folder_cache.get(max_depth)
+        if cached is not None and cached[0] == stamp:
+            return list(cached[1])
 
-                    if depth <= max_depth:
-                        folders.append(str(relative_path))
+        try:
+            # Walk the vault level by level, skipping hidden and system
+            # folders without descending into them
+            folders = list_folders(self.vault_path, max_depth)
 
-            logger.debug(f"Found {len(folders)} folders in vault")
-            return sorted(folders)
+            logger.debug("Found %d folders in vault", len(folders))
+            folders.sort()
+            self._folder_cache.set(max_depth, (stamp, tuple(folders)))
+            return folders
 
         except Exception as e:
-            logger.warning(f"Could not scan vault folders: {e}")
+            logger.warning("Could not scan vault folders: %s", e)
             return []
 
     def _resolve_filename_conflict(self, file_path: Path) -> Path:
@@ -177,18 +412,18 @@ class VaultManager:
         extension = file_path.suffix
         parent = file_path.parent
 
+        # One directory listing instead of an exists() call per candidate
+        with os.scandir(parent) as entries:
+            existing = {entry.name for entry in entries}
+
         # Try appending numbers
         counter = 1
-        while True:
-            new_path = parent / f"{name}-{counter}{extension}"
-            if not new_path.exists():
-                logger.debug(f"Resolved filename conflict: {file_path.name} -> {new_path.name}")
-                return new_path
+        while f"{name}-{counter}{extension}" in existing:
             counter += 1
 
-            # Safety limit
-            if counter > 1000:
-                raise VaultError("Could not resolve filename conflict after 1000 attempts")
+        new_path = parent / f"{name}-{counter}{extension}"
+        logger.debug("Resolved filename conflict: %s -> %s", file_path.name, new_path.name)
+        return new_path
 
     def get_incoming_folder_path(self) -> Path:
         """Get the full path to the incoming folder."""
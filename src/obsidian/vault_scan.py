@@ -0,0 +1,80 @@
+"""Fast vault directory walkers."""
+
+import os
+from pathlib import Path
+from typing import Iterator, List, Tuple, Union
+
+
+def iter_markdown(root: Union[str, Path]) -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    Walk a vault and yield its markdown files.
+
+    Hidden files and folders (names starting with '.', such as .obsidian,
+    .git or .trash) are skipped before descending into them, so their
+    contents are never listed. Symlinked folders are not followed.
+
+    Args:
+        root: Vault root directory
+
+    Yields:
+        (path relative to root, DirEntry) for each .md file
+    """
+    stack = [(os.fspath(root), '')]
+
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('.'):
+                        continue
+
+                    relative = prefix + name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, relative + os.sep))
+                        elif name.endswith('.md') and entry.is_file():
+                            yield relative, entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def list_folders(root: Union[str, Path], max_depth: int) -> List[str]:
+    """
+    List non-hidden folders of a vault down to a given depth.
+
+    Args:
+        root: Vault root directory
+        max_depth: Deepest level to include (1 = top-level folders only)
+
+    Returns:
+        Folder paths relative to root, in no particular order
+    """
+    folders = []
+    level = [(os.fspath(root), '')]
+
+    for _ in range(max_depth):
+        next_level = []
+        for directory, prefix in level:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        try:
+                            if not entry.is_dir(follow_symlinks=False):
+                                continue
+                        except OSError:
+                            continue
+
+                        relative = prefix + entry.name
+                        folders.append(relative)
+                        next_level.append((entry.path, relative + os.sep))
+            except OSError:
+                continue
+        level = next_level
+
+    return folders
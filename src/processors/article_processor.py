@@ -1,13 +1,18 @@
 """Article fetching and processing from URLs."""
 
+import asyncio
+import copy
 import logging
 import re
 from typing import Dict, Any, Optional
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from src.utils.cache import LRUCache
 
 try:
     from newspaper import Article
-    import requests
+    import httpx
     from bs4 import BeautifulSoup
     from readability import Document
     ARTICLE_LIBS_AVAILABLE = True
@@ -15,9 +20,42 @@ except ImportError:
     ARTICLE_LIBS_AVAILABLE = False
     logging.warning("Article processing libraries not available")
 
+# RE2 matches in guaranteed linear time, so it is safe on arbitrary
+# user text; the URL pattern is the same either way
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+# lxml (already required by readability) parses much faster than the
+# pure-Python parser BeautifulSoup uses by default
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
 
 logger = logging.getLogger('obsidian_telegram_bot')
 
+_USER_AGENT = 'Mozilla/5.0 (compatible; ObsidianTelegramBot/1.0)'
+
+# Title readability-lxml returns for pages without a <title>
+_READABILITY_NO_TITLE = '[no-title]'
+
+# No nested quantifiers, so no catastrophic backtracking even without
+# RE2; hits are cleaned up and validated in _clean_url_candidate
+_URL_CANDIDATE_PATTERN = r'https?://[^\s<>"\'`]+'
+_URL_CANDIDATE_RE = (re2 if RE2_AVAILABLE else re).compile(_URL_CANDIDATE_PATTERN)
+_URL_TRAILING_PUNCT = '.,;:!?*_~'
+_HOST_RE = re.compile(r'[a-z0-9](?:[-a-z0-9.]*[a-z0-9])?\.[a-z0-9-]{1,63}')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Shorter articles are summarized by _create_simple_summary instead of
+# newspaper3k's NLP pass
+_NLP_MIN_LENGTH = 2000
+
 
 class ArticleProcessorError(Exception):
     """Raised when article processing fails."""
@@ -40,6 +78,28 @@ class ArticleProcessor:
         self.fetch_full_text = self.article_config.get('fetch_full_text', True)
         self.max_length = self.article_config.get('max_length', 500)
 
+        # Domains (and their subdomains) fetched with readability only
+        self._fast_domains = frozenset(
+            domain.lower().strip('.') for domain in self.article_config.get('fast_domains') or []
+        )
+
+        # HTTP client for the readability path, created on first use so it
+        # binds to the bot's event loop
+        self._client: Optional["httpx.AsyncClient"] = None
+
+        # Fetched articles, keyed by normalized URL
+        self._cache = LRUCache(
+            maxsize=int(self.article_config.get('cache_size', 128)),
+            ttl=float(self.article_config.get('cache_ttl', 600))
+        )
+
+        # Failed fetches, so dead links are not retried on every mention
+        failure_cache_ttl = float(self.article_config.get('failure_cache_ttl', 1800))
+        self._failure_cache = LRUCache(
+            maxsize=int(self.article_config.get('cache_size', 128)) if failure_cache_ttl > 0 else 0,
+            ttl=failure_cache_ttl
+        )
+
         if self.enabled and not ARTICLE_LIBS_AVAILABLE:
             logger.warning("Article processing enabled but libraries not available")
             self.enabled = False
@@ -70,28 +130,48 @@ class ArticleProcessor:
                 'error': 'Article processing disabled'
             }
 
+        cache_key = self._normalize_url(url)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Article cache hit: %s", url)
+            return copy.deepcopy(cached)
+
+        failed = self._failure_cache.get(cache_key)
+        if failed is not None:
+            logger.debug("Skipping recently failed article: %s", url)
+            return dict(failed, url=url)
+
         try:
             logger.info(f"Fetching article: {url}")
 
-            # Try newspaper3k first (more robust)
-            result = await self._fetch_with_newspaper(url)
+            if self._is_fast_domain(url):
+                # Known-simple site: readability alone does the job
+                result = await self._fetch_with_readability(url)
+            else:
+                # Try newspaper3k first (more robust)
+                result = await self._fetch_with_newspaper(url)
 
-            if result['success']:
-                return result
+            if not result['success']:
+                # Fallback to readability
+                logger.debug("Newspaper failed, trying readability...")
+                result = await self._fetch_with_readability(url)
 
-            # Fallback to readability
-            logger.debug("Newspaper failed, trying readability...")
-            result = await self._fetch_with_readability(url)
+            if result['success']:
+                self._cache.set(cache_key, copy.deepcopy(result))
+            else:
+                self._failure_cache.set(cache_key, dict(result))
 
             return result
 
         except Exception as e:
             logger.error(f"Article processing failed for {url}: {e}")
-            return {
+            result = {
                 'url': url,
                 'success': False,
                 'error': str(e)
             }
+            self._failure_cache.set(cache_key, dict(result))
+            return result
 
     async def _fetch_with_newspaper(self, url: str) -> Dict[str, Any]:
         """
@@ -104,46 +184,78 @@ class ArticleProcessor:
             Article data dictionary
         """
         try:
-            article = Article(url)
-            article.download()
-            article.parse()
-
-            # Optionally use NLP for summary
-            try:
-                article.nlp()
-                summary = article.summary
-            except:
-                summary = None
-
-            # Clean up text
-            text = article.text.strip()
-
-            # Create summary if needed
-            if not summary and text:
-                summary = self._create_simple_summary(text)
-
-            result = {
-                'title': article.title or 'Untitled Article',
-                'text': text,
-                'summary': summary or '',
-                'author': ', '.join(article.authors) if article.authors else None,
-                'publish_date': article.publish_date,
-                'top_image': article.top_image,
-                'url': url,
-                'success': True
-            }
+            # newspaper3k downloads and parses synchronously
+            result = await asyncio.to_thread(self._newspaper_article, url)
 
             logger.info(f"Successfully fetched article: {result['title']}")
             return result
 
         except Exception as e:
-            logger.debug(f"Newspaper fetch failed: {e}")
+            logger.debug("Newspaper fetch failed: %s", e)
             return {
                 'url': url,
                 'success': False,
                 'error': f"Newspaper fetch failed: {e}"
             }
 
+    def _newspaper_article(self, url: str) -> Dict[str, Any]:
+        """
+        Download and parse an article with newspaper3k (blocking).
+
+        Args:
+            url: Article URL
+
+        Returns:
+            Article data dictionary
+        """
+        article = Article(url)
+        article.download()
+        article.parse()
+
+        # Clean up text
+        text = article.text.strip()
+
+        # Optionally use NLP for summary; not worth it for short articles
+        summary = None
+        if len(text) > _NLP_MIN_LENGTH:
+            try:
+                article.nlp()
+                summary = article.summary
+            except:
+                summary = None
+
+        # Create summary if needed
+        if not summary and text:
+            summary = self._create_simple_summary(text)
+
+        return {
+            'title': article.title or 'Untitled Article',
+            'text': text,
+            'summary': summary or '',
+            'author': ', '.join(article.authors) if article.authors else None,
+            'publish_date': article.publish_date,
+            'top_image': article.top_image,
+            'url': url,
+            'success': True
+        }
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10,
+                follow_redirects=True,
+                headers={'User-Agent': _USER_AGENT},
+                limits=httpx.Limits(max_keepalive_connections=10)
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client, if one was created."""
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
     async def _fetch_with_readability(self, url: str) -> Dict[str, Any]:
         """
         Fetch article using readability-lxml library.
@@ -156,20 +268,11 @@ class ArticleProcessor:
         """
         try:
             # Fetch HTML
-            response = requests.get(url, timeout=10, headers={
-                'User-Agent': 'Mozilla/5.0 (compatible; ObsidianTelegramBot/1.0)'
-            })
+            response = await self._get_client().get(url)
             response.raise_for_status()
 
-            # Parse with readability
-            doc = Document(response.content)
-            soup = BeautifulSoup(doc.summary(), 'html.parser')
-
-            # Extract text
-            text = soup.get_text(separator='\n', strip=True)
-
-            # Extract title
-            title = doc.title() or self._extract_title_from_html(response.content)
+            # Parsing large pages is CPU-heavy, so keep it off the loop
+            text, title = await asyncio.to_thread(self._parse_readability, response.content)
 
             # Create summary
             summary = self._create_simple_summary(text)
@@ -188,13 +291,89 @@ class ArticleProcessor:
             return result
 
         except Exception as e:
-            logger.debug(f"Readability fetch failed: {e}")
+            logger.debug("Readability fetch failed: %s", e)
             return {
                 'url': url,
                 'success': False,
                 'error': f"Readability fetch failed: {e}"
             }
 
+    def _parse_readability(self, html_content: bytes) -> tuple[str, Optional[str]]:
+        """
+        Extract article text and title from a page (blocking).
+
+        Args:
+            html_content: Raw HTML bytes
+
+        Returns:
+            Tuple of (article text, title or None)
+        """
+        doc = Document(html_content)
+        soup = BeautifulSoup(doc.summary(), _HTML_PARSER)
+
+        # Extract text
+        text = soup.get_text(separator='\n', strip=True)
+
+        # Extract title; readability reports a missing <title> as a
+        # placeholder, and only then is the page parsed a second time
+        title = doc.title()
+        if not title or title == _READABILITY_NO_TITLE:
+            title = self._extract_title_from_html(html_content)
+
+        return text, title
+
+    def _is_fast_domain(self, url: str) -> bool:
+        """
+        Check whether a URL belongs to one of the configured fast domains.
+
+        Args:
+            url: Article URL
+
+        Returns:
+            True if newspaper3k should be skipped for this URL
+        """
+        if not self._fast_domains:
+            return False
+
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            return False
+        if not host:
+            return False
+
+        # Match the host itself and every parent domain
+        parts = host.split('.')
+        return any('.'.join(parts[i:]) in self._fast_domains for i in range(len(parts)))
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """
+        Normalize a URL for use as a cache key.
+
+        Drops utm_* tracking parameters and the fragment, so the same
+        article shared from different places maps to one entry.
+
+        Args:
+            url: Article URL
+
+        Returns:
+            Normalized URL
+        """
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return url
+
+        query = parts.query
+        if 'utm_' in query:
+            query = urlencode([
+                (key, value) for key, value in parse_qsl(query, keep_blank_values=True)
+                if not key.lower().startswith('utm_')
+            ])
+
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ''))
+
     def _create_simple_summary(self, text: str) -> str:
         """
         Create a simple summary by taking first few sentences.
@@ -206,10 +385,10 @@ class ArticleProcessor:
             Summary text
         """
         # Split into sentences (simple approach)
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
 
         # Clean and filter
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+        sentences = [s for s in map(str.strip, sentences) if len(s) > 20]
 
         # Take first 3 sentences or until max_length
         summary_parts = []
@@ -238,7 +417,7 @@ class ArticleProcessor:
             Extracted title or None
         """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, _HTML_PARSER)
 
             # Try various title sources
             if soup.title:
@@ -257,7 +436,7 @@ class ArticleProcessor:
             return None
 
         except Exception as e:
-            logger.debug(f"Could not extract title from HTML: {e}")
+            logger.debug("Could not extract title from HTML: %s", e)
             return None
 
     @staticmethod
@@ -271,8 +450,11 @@ class ArticleProcessor:
         Returns:
             List of found URLs
         """
-        url_pattern = r'https?://(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&/=]*)'
-        urls = re.findall(url_pattern, text)
+        urls = []
+        for candidate in _URL_CANDIDATE_RE.findall(text):
+            url = _clean_url_candidate(candidate)
+            if url:
+                urls.append(url)
         return urls
 
     async def format_article_for_note(
@@ -321,3 +503,31 @@ class ArticleProcessor:
             lines.append(text)
 
         return '\n'.join(lines)
+
+
+def _clean_url_candidate(candidate: str) -> Optional[str]:
+    """
+    Trim and validate a raw URL match.
+
+    Args:
+        candidate: Text matched by _URL_CANDIDATE_RE
+
+    Returns:
+        The URL without trailing punctuation, or None if it has no
+        plausible host
+    """
+    url = candidate.rstrip(_URL_TRAILING_PUNCT)
+
+    # Drop closing brackets that belong to the surrounding text
+    while url.endswith(')') and url.count(')') > url.count('('):
+        url = url[:-1].rstrip(_URL_TRAILING_PUNCT)
+
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return None
+
+    if not host or not _HOST_RE.fullmatch(host):
+        return None
+
+    return url
@@ -9,6 +9,11 @@ from src.ai.prompts import FALLBACK_ANALYSIS
 
 logger = logging.getLogger('obsidian_telegram_bot')
 
+# Characters not allowed in filenames / folder paths, mapped to '-' so
+# each string is cleaned in a single pass
+_TITLE_TRANSLATION = str.maketrans(dict.fromkeys('/\\:*?"<>|', '-'))
+_FOLDER_TRANSLATION = str.maketrans(dict.fromkeys('\\:*?"<>|', '-'))
+
 
 class ContentAnalyzer:
     """Orchestrates content analysis using AI providers."""
@@ -25,6 +30,11 @@ class ContentAnalyzer:
         self.config = config
         self.fallback_on_error = config.get('bot', {}).get('fallback_on_ai_error', True)
 
+    async def warmup(self) -> None:
+        """Warm up the AI provider so the first message is not slowed by setup."""
+        logger.info("Warming up AI provider...")
+        await self.ai.warmup()
+
     async def analyze(
         self,
         content: str,
@@ -142,10 +152,7 @@ class ContentAnalyzer:
             return "Untitled Note"
 
         # Remove or replace invalid filename characters
-        invalid_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
-        sanitized = title
-        for char in invalid_chars:
-            sanitized = sanitized.replace(char, '-')
+        sanitized = title.translate(_TITLE_TRANSLATION)
 
         # Remove leading/trailing whitespace and dots
         sanitized = sanitized.strip('. ')
@@ -206,9 +213,7 @@ class ContentAnalyzer:
         folder = folder.strip('/')
 
         # Remove invalid characters
-        invalid_chars = ['\\', ':', '*', '?', '"', '<', '>', '|']
-        for char in invalid_chars:
-            folder = folder.replace(char, '-')
+        folder = folder.translate(_FOLDER_TRANSLATION)
 
         return folder or "Inbox"
 
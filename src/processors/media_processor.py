@@ -1,19 +1,62 @@
 """Media processing - images, voice, video."""
 
+import asyncio
+import hashlib
+import io
+import itertools
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional
 import tempfile
+import time
+
+from src.utils.cache import LRUCache
+
+# Several single-threaded tesseract runs in parallel beat one run using
+# OpenMP threads; must be set before tesseract is loaded
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+try:
+    from PIL import Image, ImageFilter, ImageStat
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
 
 try:
     import pytesseract
-    from PIL import Image
-    TESSERACT_AVAILABLE = True
+    TESSERACT_AVAILABLE = PIL_AVAILABLE
 except ImportError:
     TESSERACT_AVAILABLE = False
+
+if not TESSERACT_AVAILABLE:
     logging.warning("pytesseract or PIL not available - OCR will be disabled")
 
+# tesserocr binds libtesseract directly: the language model is loaded once
+# per API instance instead of by a new tesseract process for every call
+try:
+    from tesserocr import PyTessBaseAPI
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Optional neural OCR backend, worthwhile on machines with a GPU
+try:
+    import easyocr
+    import numpy as np
+    EASYOCR_AVAILABLE = True
+except ImportError:
+    EASYOCR_AVAILABLE = False
+
+# EasyOCR names languages differently from tesseract
+_EASYOCR_LANGUAGES = {
+    'eng': 'en', 'deu': 'de', 'fra': 'fr', 'spa': 'es', 'ita': 'it',
+    'por': 'pt', 'nld': 'nl', 'pol': 'pl', 'rus': 'ru', 'ukr': 'uk',
+    'jpn': 'ja', 'kor': 'ko', 'chi_sim': 'ch_sim', 'chi_tra': 'ch_tra',
+}
+
 
 logger = logging.getLogger('obsidian_telegram_bot')
 
@@ -37,11 +80,52 @@ class MediaProcessor:
         self.media_config = config.get('media', {})
         self.ocr_enabled = self.media_config.get('ocr', {}).get('enabled', True)
         self.ocr_language = self.media_config.get('ocr', {}).get('language', 'eng')
+        self.ocr_workers = self.media_config.get('ocr', {}).get('max_workers') or os.cpu_count() or 1
+        self.ocr_max_dimension = int(self.media_config.get('ocr', {}).get('max_dimension', 2000) or 0)
+        self.ocr_min_edge_density = float(self.media_config.get('ocr', {}).get('min_edge_density', 0) or 0)
+
+        # OCR results keyed by image content hash, so forwarded copies of
+        # the same picture are recognized once; shared by the OCR threads
+        self._ocr_cache = LRUCache(
+            maxsize=int(self.media_config.get('ocr', {}).get('cache_size', 256))
+        )
+        self._ocr_cache_lock = threading.Lock()
+
+        # Tells apart temp downloads started within the same second
+        self._download_ids = itertools.count()
+
+        # "tesseract" (default) or "easyocr"
+        self.ocr_backend = str(self.media_config.get('ocr', {}).get('backend', 'tesseract')).lower()
+        self.ocr_gpu = self.media_config.get('ocr', {}).get('gpu', True)
 
-        if self.ocr_enabled and not TESSERACT_AVAILABLE:
+        if self.ocr_backend == 'easyocr' and not (EASYOCR_AVAILABLE and PIL_AVAILABLE):
+            logger.warning("EasyOCR backend selected but easyocr not available, using tesseract")
+            self.ocr_backend = 'tesseract'
+
+        if self.ocr_enabled and self.ocr_backend == 'tesseract' and not TESSERACT_AVAILABLE:
             logger.warning("OCR enabled in config but pytesseract not available")
             self.ocr_enabled = False
 
+        # EasyOCR reader, loaded on first use; one model shared by all
+        # OCR threads, which take turns running it
+        self._easyocr_reader: Optional["easyocr.Reader"] = None
+        self._easyocr_lock = threading.Lock()
+
+        # One tesserocr API per OCR thread; an instance is not thread-safe
+        self._tess_local = threading.local()
+        self._tess_apis: List["PyTessBaseAPI"] = []
+        self._tess_lock = threading.Lock()
+        self._use_tesserocr = (
+            self.ocr_enabled and self.ocr_backend == 'tesseract' and TESSEROCR_AVAILABLE
+        )
+
+        # Tesseract releases the GIL, so threads run OCR in parallel; a
+        # dedicated pool keeps it from crowding out other to_thread work
+        self._ocr_pool = ThreadPoolExecutor(
+            max_workers=self.ocr_workers,
+            thread_name_prefix='ocr'
+        )
+
     async def process_image(
         self,
         file_path: str,
@@ -52,7 +136,8 @@ class MediaProcessor:
 
         Args:
             file_path: Path to downloaded image file
-            file_data: Optional raw file data
+            file_data: Optional raw file data; when given, the image is
+                decoded from memory instead of re-read from file_path
 
         Returns:
             Dictionary with:
@@ -69,30 +154,61 @@ class MediaProcessor:
                 'confidence': 0.0
             }
 
-        try:
-            logger.debug(f"Processing image for OCR: {file_path}")
+        # Tesseract blocks for the whole recognition, so keep it off the loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._ocr_pool, self._ocr_image, file_path, file_data)
 
-            # Open image
-            img = Image.open(file_path)
+    def _ocr_image(self, file_path: str, file_data: Optional[bytes] = None) -> Dict[str, Any]:
+        """
+        Run OCR on an image file (blocking).
 
-            # Perform OCR
-            ocr_text = pytesseract.image_to_string(
-                img,
-                lang=self.ocr_language
-            )
+        Args:
+            file_path: Path to image file
+            file_data: Raw image bytes, used instead of reading file_path
 
-            # Get confidence data
-            try:
+        Returns:
+            Same dictionary as process_image
+        """
+        try:
+            logger.debug("Processing image for OCR: %s", file_path)
+
+            cache_key = self._image_digest(file_path, file_data)
+            with self._ocr_cache_lock:
+                cached = self._ocr_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("OCR cache hit")
+                return dict(cached)
+
+            # Open image
+            source = io.BytesIO(file_data) if file_data is not None else file_path
+            img = self._prepare_for_ocr(Image.open(source))
+
+            api = self._get_tess_api()
+            if self._looks_textless(img):
+                logger.debug("Image has too little detail for text, skipping OCR")
+                ocr_text, avg_confidence = '', 0.0
+            elif self.ocr_backend == 'easyocr':
+                ocr_text, avg_confidence = self._ocr_with_easyocr(img)
+            elif api is not None:
+                # Text and confidence from a single recognition pass
+                try:
+                    # Hand over the raw 8-bit plane; SetImage would encode
+                    # the image to a file format for tesseract to decode
+                    width, height = img.size
+                    api.SetImageBytes(img.tobytes(), width, height, 1, width)
+                    ocr_text = api.GetUTF8Text()
+                    avg_confidence = api.MeanTextConf()
+                finally:
+                    api.Clear()
+            else:
+                # One tesseract run gives both the words and their confidences
                 data = pytesseract.image_to_data(
                     img,
                     output_type=pytesseract.Output.DICT,
                     lang=self.ocr_language
                 )
-                confidences = [c for c in data['conf'] if c != -1]
-                avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            except Exception as e:
-                logger.debug(f"Could not get OCR confidence: {e}")
-                avg_confidence = 0
+                ocr_text = _text_from_ocr_data(data)
+                avg_confidence = _mean_confidence(data['conf'])
 
             # Clean up text
             ocr_text = ocr_text.strip()
@@ -100,11 +216,14 @@ class MediaProcessor:
 
             logger.info(f"OCR completed - Found text: {has_text}, Confidence: {avg_confidence:.1f}%")
 
-            return {
+            result = {
                 'ocr_text': ocr_text,
                 'has_text': has_text,
                 'confidence': avg_confidence
             }
+            with self._ocr_cache_lock:
+                self._ocr_cache.set(cache_key, dict(result))
+            return result
 
         except Exception as e:
             logger.error(f"OCR processing failed: {e}")
@@ -115,6 +234,138 @@ class MediaProcessor:
                 'error': str(e)
             }
 
+    @staticmethod
+    def _image_digest(file_path: str, file_data: Optional[bytes] = None) -> bytes:
+        """
+        Hash an image's content for the OCR cache.
+
+        Args:
+            file_path: Path to image file
+            file_data: Raw image bytes, hashed instead of reading file_path
+
+        Returns:
+            128-bit BLAKE2b digest
+        """
+        if file_data is not None:
+            return hashlib.blake2b(file_data, digest_size=16).digest()
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        return digest.digest()
+
+    def _prepare_for_ocr(self, img: "Image.Image") -> "Image.Image":
+        """
+        Shrink and grayscale an image before OCR.
+
+        Tesseract's cost grows with the pixel count, and phone photos are
+        far larger than text recognition needs.
+
+        Args:
+            img: Opened (not yet decoded) image
+
+        Returns:
+            Grayscale image no larger than ocr_max_dimension on either side
+        """
+        limit = self.ocr_max_dimension
+        if limit and max(img.size) > limit:
+            # Lets the JPEG decoder scale down while decoding
+            img.draft('L', (limit, limit))
+
+        img = img.convert('L')
+
+        if limit and max(img.size) > limit:
+            img.thumbnail((limit, limit), Image.Resampling.LANCZOS)
+
+        return img
+
+    def _looks_textless(self, img: "Image.Image") -> bool:
+        """
+        Cheaply guess whether an image is too smooth to contain text.
+
+        Text produces many sharp edges; photos of faces, landscapes and
+        flat graphics mostly do not. Disabled when ocr_min_edge_density
+        is 0.
+
+        Args:
+            img: Prepared grayscale image
+
+        Returns:
+            True if OCR can be skipped
+        """
+        if not self.ocr_min_edge_density:
+            return False
+
+        small = img.resize((256, 256), Image.Resampling.BILINEAR)
+        edge_density = ImageStat.Stat(small.filter(ImageFilter.FIND_EDGES)).mean[0]
+        return edge_density < self.ocr_min_edge_density
+
+    def _ocr_with_easyocr(self, img: "Image.Image") -> tuple[str, float]:
+        """
+        Recognize text with EasyOCR (blocking).
+
+        Args:
+            img: Prepared image
+
+        Returns:
+            Tuple of (text with one detected line per row, mean confidence 0-100)
+        """
+        with self._easyocr_lock:
+            if self._easyocr_reader is None:
+                languages = [
+                    _EASYOCR_LANGUAGES.get(code, code)
+                    for code in self.ocr_language.split('+')
+                ]
+                self._easyocr_reader = easyocr.Reader(languages, gpu=self.ocr_gpu)
+
+            results = self._easyocr_reader.readtext(np.asarray(img))
+
+        ocr_text = '\n'.join(text for _, text, _ in results)
+        confidences = [confidence for _, _, confidence in results]
+        avg_confidence = 100 * sum(confidences) / len(confidences) if confidences else 0
+        return ocr_text, avg_confidence
+
+    def _get_tess_api(self) -> Optional["PyTessBaseAPI"]:
+        """
+        Get this thread's tesserocr API, creating it on first use.
+
+        Returns:
+            Initialized API, or None to fall back to pytesseract
+        """
+        if not self._use_tesserocr:
+            return None
+
+        api = getattr(self._tess_local, 'api', None)
+        if api is None:
+            try:
+                api = PyTessBaseAPI(lang=self.ocr_language)
+            except Exception as e:
+                logger.warning(f"Could not initialize tesserocr, using pytesseract: {e}")
+                self._use_tesserocr = False
+                return None
+
+            self._tess_local.api = api
+            with self._tess_lock:
+                self._tess_apis.append(api)
+
+        return api
+
+    def close(self) -> None:
+        """Stop the OCR threads and release their tesserocr APIs."""
+        self._ocr_pool.shutdown(wait=True)
+
+        with self._tess_lock:
+            apis, self._tess_apis = self._tess_apis, []
+        for api in apis:
+            api.End()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     async def process_voice(
         self,
         file_path: str,
@@ -177,34 +428,32 @@ class MediaProcessor:
         self,
         file,
         bot
-    ) -> tuple[Path, bytes]:
+    ) -> Path:
         """
         Download a file from Telegram.
 
+        The file is streamed straight to a temporary file rather than
+        buffered in memory first.
+
         Args:
             file: Telegram File object
             bot: Telegram bot instance
 
         Returns:
-            Tuple of (file_path, file_data)
+            Path to the downloaded temporary file (caller deletes it)
         """
         try:
-            # Download file
-            file_data = await file.download_as_bytearray()
-
             # Generate filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
             file_ext = Path(file.file_path).suffix if hasattr(file, 'file_path') else ''
-            filename = f"telegram_{timestamp}{file_ext}"
+            filename = f"telegram_{timestamp}_{next(self._download_ids)}{file_ext}"
 
-            # Save to temp file
+            # Download to temp file
             temp_dir = Path(tempfile.gettempdir())
-            file_path = temp_dir / filename
-
-            file_path.write_bytes(bytes(file_data))
+            file_path = await file.download_to_drive(custom_path=temp_dir / filename)
 
-            logger.debug(f"Downloaded Telegram file: {filename}")
-            return file_path, bytes(file_data)
+            logger.debug("Downloaded Telegram file: %s", filename)
+            return file_path
 
         except Exception as e:
             logger.error(f"Failed to download Telegram file: {e}")
@@ -225,7 +474,7 @@ class MediaProcessor:
         Returns:
             Generated filename
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
 
         if original_filename:
             # Keep original extension
@@ -243,3 +492,64 @@ class MediaProcessor:
             }
             ext = extensions.get(media_type, '')
             return f"telegram_{media_type}_{timestamp}{ext}"
+
+
+def _text_from_ocr_data(data: Dict[str, List[Any]]) -> str:
+    """
+    Rebuild plain text from pytesseract.image_to_data output.
+
+    Words on a line are joined by spaces, lines by newlines, and
+    paragraphs are separated by a blank line, like image_to_string.
+
+    Args:
+        data: image_to_data result with Output.DICT
+
+    Returns:
+        Recognized text
+    """
+    paragraphs: List[List[str]] = []
+    lines: Dict[tuple, List[str]] = {}
+    last_paragraph = None
+
+    for page, block, par, line, word in zip(
+        data['page_num'], data['block_num'], data['par_num'], data['line_num'], data['text']
+    ):
+        word = word.strip() if word else ''
+        if not word:
+            continue
+
+        paragraph = (page, block, par)
+        if paragraph != last_paragraph:
+            paragraphs.append([])
+            last_paragraph = paragraph
+
+        key = (page, block, par, line)
+        words = lines.get(key)
+        if words is None:
+            words = lines[key] = []
+            paragraphs[-1].append(words)
+        words.append(word)
+
+    return '\n\n'.join(
+        '\n'.join(' '.join(words) for words in paragraph)
+        for paragraph in paragraphs
+    )
+
+
+def _mean_confidence(confidences: List[Any]) -> float:
+    """
+    Average word confidence from image_to_data, ignoring non-word rows.
+
+    Args:
+        confidences: The 'conf' column (-1 marks page/block/line rows)
+
+    Returns:
+        Mean confidence (0-100), or 0 if there are no words
+    """
+    total = 0.0
+    count = 0
+    for conf in map(float, confidences):
+        if conf != -1:
+            total += conf
+            count += 1
+    return total / count if count else 0
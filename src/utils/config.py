@@ -2,11 +2,17 @@
 
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, FrozenSet, Mapping, Optional
 
 import yaml
 from dotenv import load_dotenv
 
+# libyaml's C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 class ConfigurationError(Exception):
     """Raised when configuration is invalid or missing."""
@@ -42,7 +48,7 @@ class ConfigLoader:
         # Load YAML configuration
         try:
             with open(self.config_path, 'r') as f:
-                yaml_config = yaml.safe_load(f)
+                yaml_config = yaml.load(f, Loader=_YamlLoader)
                 if yaml_config is None:
                     raise ConfigurationError(f"Empty or invalid YAML file: {self.config_path}")
                 self.config = yaml_config
@@ -76,10 +82,8 @@ class ConfigLoader:
         if ai_provider == 'claude':
             required_vars.append('CLAUDE_API_KEY')
 
-        missing_vars = []
-        for var in required_vars:
-            if not os.getenv(var):
-                missing_vars.append(var)
+        env = os.environ
+        missing_vars = [var for var in required_vars if not env.get(var)]
 
         if missing_vars:
             raise ConfigurationError(
@@ -88,7 +92,7 @@ class ConfigLoader:
             )
 
         # Validate vault path exists
-        vault_path = Path(os.getenv('OBSIDIAN_VAULT_PATH'))
+        vault_path = Path(env['OBSIDIAN_VAULT_PATH'])
         if not vault_path.exists():
             raise ConfigurationError(
                 f"Obsidian vault path does not exist: {vault_path}\n"
@@ -97,34 +101,40 @@ class ConfigLoader:
 
     def _merge_env_vars(self) -> None:
         """Merge environment variables into the configuration dict."""
+        env = os.environ
+
         self.config['telegram'] = {
-            'bot_token': os.getenv('TELEGRAM_BOT_TOKEN'),
-            'allowed_users': self._parse_allowed_users(),
+            'bot_token': env.get('TELEGRAM_BOT_TOKEN'),
+            'allowed_users': self._parse_allowed_users(env),
         }
 
-        self.config['obsidian']['vault_path'] = os.getenv('OBSIDIAN_VAULT_PATH')
+        self.config['obsidian']['vault_path'] = env.get('OBSIDIAN_VAULT_PATH')
 
         # Override incoming folder if set in env
-        if os.getenv('OBSIDIAN_INCOMING_FOLDER'):
-            self.config['obsidian']['incoming_folder'] = os.getenv('OBSIDIAN_INCOMING_FOLDER')
+        incoming_folder = env.get('OBSIDIAN_INCOMING_FOLDER')
+        if incoming_folder:
+            self.config['obsidian']['incoming_folder'] = incoming_folder
 
         # AI API keys
-        self.config['ai']['claude']['api_key'] = os.getenv('CLAUDE_API_KEY', '')
-        self.config['ai']['ollama']['base_url'] = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+        self.config['ai']['claude']['api_key'] = env.get('CLAUDE_API_KEY', '')
+        self.config['ai']['ollama']['base_url'] = env.get('OLLAMA_BASE_URL', 'http://localhost:11434')
 
-    def _parse_allowed_users(self) -> Optional[list]:
+    def _parse_allowed_users(self, env: Mapping[str, str]) -> Optional[FrozenSet[int]]:
         """
         Parse comma-separated list of allowed user IDs.
 
+        Args:
+            env: Environment variables
+
         Returns:
-            List of integer user IDs, or None if not set (allow all)
+            Set of integer user IDs, or None if not set (allow all)
         """
-        users_str = os.getenv('TELEGRAM_ALLOWED_USERS', '')
+        users_str = env.get('TELEGRAM_ALLOWED_USERS', '')
         if not users_str:
             return None
 
         try:
-            return [int(uid.strip()) for uid in users_str.split(',') if uid.strip()]
+            return frozenset(int(uid) for uid in map(str.strip, users_str.split(',')) if uid)
         except ValueError:
             raise ConfigurationError(
                 f"Invalid TELEGRAM_ALLOWED_USERS format: {users_str}\n"
@@ -141,13 +151,12 @@ class ConfigLoader:
         Raises:
             ConfigurationError: If provider is unknown or cannot be initialized
         """
-        from src.ai.base import AIProvider
-        from src.ai.claude_provider import ClaudeProvider
-        from src.ai.ollama_provider import OllamaProvider
-
         provider_name = self.config.get('ai', {}).get('provider', 'claude')
 
+        # Import only the selected provider so the other SDK is never loaded
         if provider_name == 'claude':
+            from src.ai.claude_provider import ClaudeProvider
+
             api_key = self.config['ai']['claude'].get('api_key')
             if not api_key:
                 raise ConfigurationError("Claude API key not set in environment")
@@ -159,6 +168,8 @@ class ConfigLoader:
             )
 
         elif provider_name == 'ollama':
+            from src.ai.ollama_provider import OllamaProvider
+
             return OllamaProvider(
                 base_url=self.config['ai']['ollama']['base_url'],
                 model=self.config['ai']['ollama']['model'],
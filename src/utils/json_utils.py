@@ -0,0 +1,97 @@
+"""JSON serialization helpers, backed by orjson when it is installed."""
+
+import json
+from typing import Any, Tuple, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# orjson.JSONDecodeError subclasses this, so callers can catch one type
+JSONDecodeError = json.JSONDecodeError
+
+_DECODER = json.JSONDecoder()
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    """
+    Serialize an object to a JSON string.
+
+    Non-ASCII characters are written as-is rather than escaped, and values
+    that are not natively serializable fall back to ``str()``.
+
+    Args:
+        obj: Object to serialize
+        pretty: Indent the output by two spaces
+
+    Returns:
+        JSON string
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option).decode('utf-8')
+
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None, default=str)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """
+    Serialize an object to compact UTF-8 encoded JSON.
+
+    Same output as dumps() without indentation, but skips the str
+    round trip orjson would otherwise need.
+
+    Args:
+        obj: Object to serialize
+
+    Returns:
+        JSON as UTF-8 bytes
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+    return json.dumps(obj, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: JSON text or UTF-8 encoded bytes
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        JSONDecodeError: If the input is not valid JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def raw_decode(text: str, start: int = 0) -> Tuple[Any, int]:
+    """
+    Parse the JSON value that begins at ``start`` and ignore anything after it.
+
+    Useful for pulling a JSON object out of surrounding prose in a single
+    pass. orjson has no equivalent, so this always uses the stdlib decoder.
+
+    Args:
+        text: Text containing a JSON value
+        start: Index of the value's first character
+
+    Returns:
+        (parsed object, index just past the value)
+
+    Raises:
+        JSONDecodeError: If no valid JSON value starts at ``start``
+    """
+    return _DECODER.raw_decode(text, start)
@@ -1,14 +1,19 @@
 """Logging configuration for the Telegram-Obsidian bot."""
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from src.utils import json_utils
 
-class ColoredFormatter(logging.Formatter):
-    """Colored formatter for console output."""
+
+class ColorFilter(logging.Filter):
+    """Adds a colored copy of the level name for console output."""
 
     # ANSI color codes
     COLORS = {
@@ -21,25 +26,27 @@ class ColoredFormatter(logging.Formatter):
     RESET = '\033[0m'
     BOLD = '\033[1m'
 
-    def format(self, record):
-        # Add color to levelname
-        levelname = record.levelname
-        if levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[levelname]}{levelname}{self.RESET}"
-
-        # Format the message
-        result = super().format(record)
+    def __init__(self, name: str = ''):
+        super().__init__(name)
 
-        # Reset levelname for other handlers
-        record.levelname = levelname
+        # Colored level names, built once instead of on every record
+        self._colored_levels = {
+            level: f"{color}{level}{self.RESET}" for level, color in self.COLORS.items()
+        }
 
-        return result
+    def filter(self, record):
+        # Stored under its own name, so record.levelname stays plain for
+        # every other handler
+        levelname = record.levelname
+        record.levelname_color = self._colored_levels.get(levelname, levelname)
+        return True
 
 
 class BotLogger:
     """Centralized logging configuration."""
 
     _instance: Optional[logging.Logger] = None
+    _listener: Optional[logging.handlers.QueueListener] = None
 
     @classmethod
     def setup(cls, config: dict) -> logging.Logger:
@@ -59,6 +66,8 @@ class BotLogger:
         log_config = config.get('logging', {})
         log_file = log_config.get('file', 'logs/bot.log')
         log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
+        # The file gets the console's level unless asked for more (or less)
+        file_level = os.getenv('LOG_FILE_LEVEL', log_level).upper()
         max_bytes = log_config.get('max_size_mb', 10) * 1024 * 1024
         backup_count = log_config.get('backup_count', 5)
         console_output = log_config.get('console_output', True)
@@ -69,7 +78,9 @@ class BotLogger:
 
         # Create logger
         logger = logging.getLogger('obsidian_telegram_bot')
-        logger.setLevel(getattr(logging, log_level, logging.INFO))
+        console_level_no = getattr(logging, log_level, logging.INFO)
+        file_level_no = getattr(logging, file_level, console_level_no)
+        logger.setLevel(min(console_level_no, file_level_no) if console_output else file_level_no)
 
         # Prevent propagation to root logger to avoid duplicate messages
         logger.propagate = False
@@ -82,8 +93,8 @@ class BotLogger:
             '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(funcName)s:%(lineno)d - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-        colored_formatter = ColoredFormatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
+        colored_formatter = logging.Formatter(
+            '%(asctime)s - %(levelname_color)s - %(message)s',
             datefmt='%H:%M:%S'
         )
 
@@ -94,22 +105,40 @@ class BotLogger:
             backupCount=backup_count,
             encoding='utf-8'
         )
-        file_handler.setLevel(logging.DEBUG)
+        file_handler.setLevel(file_level_no)
         file_handler.setFormatter(detailed_formatter)
-        logger.addHandler(file_handler)
+        handlers = [file_handler]
 
         # Console handler with colors
         if console_output:
             console_handler = logging.StreamHandler()
-            console_handler.setLevel(getattr(logging, log_level, logging.INFO))
+            console_handler.setLevel(console_level_no)
+            console_handler.addFilter(ColorFilter())
             console_handler.setFormatter(colored_formatter)
-            logger.addHandler(console_handler)
+            handlers.append(console_handler)
+
+        # Callers (including the event loop) only enqueue records; a
+        # background thread does the writes and file rotation
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        cls._listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        cls._listener.start()
+        atexit.register(cls.shutdown)
 
         cls._instance = logger
         logger.info(f"Logging initialized - Level: {log_level}, File: {log_file}")
 
         return logger
 
+    @classmethod
+    def shutdown(cls) -> None:
+        """Write out queued records and stop the logging thread."""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
     @classmethod
     def get_logger(cls) -> logging.Logger:
         """Get the logger instance."""
@@ -139,9 +168,10 @@ class EvaluationLogger:
         if cls._instance is not None:
             return cls._instance
 
-        # Create evaluation logger
+        # Create evaluation logger (set EVAL_LOG_LEVEL=WARNING to skip detailed payloads)
+        eval_level = os.getenv('EVAL_LOG_LEVEL', 'DEBUG').upper()
         eval_logger = logging.getLogger('obsidian_telegram_bot.evaluation')
-        eval_logger.setLevel(logging.DEBUG)
+        eval_logger.setLevel(getattr(logging, eval_level, logging.DEBUG))
         eval_logger.propagate = False
 
         # Remove existing handlers
@@ -152,7 +182,6 @@ class EvaluationLogger:
         eval_dir.mkdir(parents=True, exist_ok=True)
 
         # Create daily log file with date in filename
-        from datetime import datetime
         today = datetime.now().strftime('%Y-%m-%d')
         log_file = eval_dir / f'{today}-eval.log'
 
@@ -173,16 +202,17 @@ class EvaluationLogger:
         eval_logger.addHandler(file_handler)
 
         cls._instance = eval_logger
-        eval_logger.info('"message": "Evaluation logging started", "file": "' + str(log_file) + '"')
+        eval_logger.info(json_utils.dumps({
+            "message": "Evaluation logging started",
+            "file": str(log_file)
+        }))
 
         return eval_logger
 
     @classmethod
     def get_logger(cls) -> logging.Logger:
         """Get the evaluation logger instance."""
-        if cls._instance is None:
-            return cls.setup()
-        return cls._instance
+        return cls._instance or cls.setup()
 
 
 def get_eval_logger() -> logging.Logger: